@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Execution Budgets for Pangea and Plan programs
+Limits on steps, call depth, wall-clock time and output of one run
+
+A step is a loop iteration or a user function call, the only ways a
+program can keep running without bound. Engines report steps to the
+budget, which only looks at its limits every check_every steps (and
+exactly at the step that would pass max_steps), so an unlimited or
+generous budget costs a counter decrement per step.
+"""
+
+import time
+from typing import Callable, Optional
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a program runs past a limit of its ExecutionBudget
+
+    limit names the limit: 'steps', 'depth', 'seconds' or 'output'.
+    """
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+
+class ExecutionBudget:
+    """Limits on a single run of a program, None meaning unlimited
+
+    max_output counts characters written. Time and output are checked
+    every check_every steps, so a run may overshoot them by that many
+    steps; steps and depth are enforced exactly.
+
+    max_depth counts the user function frames in use. The tree walker
+    runs calls in tail position in their caller's frame, so tail
+    recursion never deepens there, while PangeaVM, which has no tail
+    calls, counts every call.
+    """
+
+    def __init__(self, max_steps: Optional[int] = None, max_depth: Optional[int] = None,
+                 max_seconds: Optional[float] = None, max_output: Optional[int] = None,
+                 check_every: int = 1000):
+        self.max_steps = max_steps
+        self.max_depth = max_depth
+        self.max_seconds = max_seconds
+        self.max_output = max_output
+        self.check_every = check_every
+        self.start()
+
+    def start(self, output_size: Optional[Callable[[], int]] = None):
+        """Begin a run, given a function returning the output written so far"""
+        self._output_size = output_size
+        self._output_start = output_size() if output_size is not None else 0
+        self._deadline = None if self.max_seconds is None else time.monotonic() + self.max_seconds
+        self._counted = 0
+        self._interval = self._countdown = self._next_interval()
+
+    @property
+    def steps(self) -> int:
+        """Steps taken since the run began"""
+        return self._counted + self._interval - self._countdown
+
+    def step(self):
+        """Count a step, checking the limits when due"""
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self.check()
+
+    def call(self, depth: int):
+        """Count a user function call that makes the call depth depth"""
+        if self.max_depth is not None and depth > self.max_depth:
+            raise BudgetExceeded('depth', f"Call depth limit of {self.max_depth} exceeded")
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self.check()
+
+    def check(self):
+        """Raise BudgetExceeded if a limit has been passed"""
+        self._counted = self.steps
+        self._interval = self._countdown = 0
+        if self.max_steps is not None and self._counted > self.max_steps:
+            raise BudgetExceeded('steps', f"Step limit of {self.max_steps} exceeded")
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise BudgetExceeded('seconds', f"Time limit of {self.max_seconds} s exceeded")
+        if self.max_output is not None and self._output_size is not None:
+            if self._output_size() - self._output_start > self.max_output:
+                raise BudgetExceeded('output', f"Output limit of {self.max_output} characters exceeded")
+        self._interval = self._countdown = self._next_interval()
+
+    def _next_interval(self) -> int:
+        """Steps until the next check, landing exactly on the step limit"""
+        if self.max_steps is None:
+            return self.check_every
+        return max(1, min(self.check_every, self.max_steps - self._counted + 1))
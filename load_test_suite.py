@@ -360,7 +360,7 @@ class LoadTestSuite:
         """Test behavior under resource exhaustion"""
         print("Testing resource exhaustion scenarios...")
         
-        # Test with very deep recursion (should hit recursion limit gracefully)
+        # Test with very deep recursion (tail calls run in constant stack)
         interpreter = PangeaInterpreter()
         interpreter.exec('''
             def deep_recursion#1
@@ -370,12 +370,12 @@ class LoadTestSuite:
         ''')
         
         try:
-            result = interpreter.exec('deep_recursion 1000')
-            print("   Deep recursion (1000): ✅")
+            result = interpreter.exec('deep_recursion 100000')
+            print("   Deep recursion (100000): ✅")
         except RecursionError:
-            print("   Deep recursion (1000): ⚠️  Hit recursion limit (expected)")
+            print("   Deep recursion (100000): ❌ Hit recursion limit")
         except Exception as e:
-            print(f"   Deep recursion (1000): ❌ Unexpected error: {e}")
+            print(f"   Deep recursion (100000): ❌ Unexpected error: {e}")
         
         # Test with very large arrays
         try:
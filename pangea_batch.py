@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Batch Execution for the Pangea Python Interpreter
+Run many programs through a pool of reused interpreters
+
+Constructing an interpreter builds its whole built-in namespace, and an
+interpreter fed job after job keeps growing its word list. run_batch
+instead takes interpreters from an InterpreterPool and reset()s them
+between jobs, so every job starts from a clean, already warmed
+interpreter.
+
+run_parallel does the same across worker processes, each with its own
+pool, for throughput beyond what one interpreter (and the GIL) allows.
+"""
+
+import os
+import sys
+import copy
+import time
+import queue
+import statistics
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer
+from pangea_vm import PangeaVM
+
+
+# Engines selectable by name, as in pangea_cli
+ENGINES = {'tree': PangeaInterpreter, 'vm': PangeaVM}
+
+# A Pangea source string, or a program returned by ingest_program
+Program = Union[str, Dict[str, Any]]
+
+
+class BatchResult:
+    """Outcome of one job of a batch
+
+    error holds "ExceptionType: message" when the program raised, in
+    which case result is None. seconds is the wall time of the job.
+    """
+
+    __slots__ = ('result', 'output', 'seconds', 'error')
+
+    def __init__(self, result: Any, output: str, seconds: float, error: Optional[str] = None):
+        self.result = result
+        self.output = output
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self):
+        return (f"BatchResult(result={self.result!r}, output={self.output!r}, "
+                f"seconds={self.seconds:.6f}, error={self.error!r})")
+
+
+class InterpreterPool:
+    """Interpreters with captured output, reset and reused between jobs
+
+    Interpreters are constructed on demand, up to one per concurrent
+    borrower, and each is only ever used by one borrower at a time.
+    """
+
+    def __init__(self, interpreter_class=PangeaInterpreter, **options):
+        self.interpreter_class = interpreter_class
+        self.options = options
+        self._idle: queue.SimpleQueue = queue.SimpleQueue()
+
+    @contextmanager
+    def interpreter(self) -> Iterator[PangeaInterpreter]:
+        """Borrow a fresh interpreter, returned to the pool reset"""
+        try:
+            borrowed = self._idle.get_nowait()
+        except queue.Empty:
+            options = dict(self.options)
+            if options.get('budget') is not None:
+                # Budgets count per run, so each interpreter needs its own
+                options['budget'] = copy.copy(options['budget'])
+            borrowed = self.interpreter_class(output=OutputBuffer(capture=True), **options)
+        try:
+            yield borrowed
+        finally:
+            borrowed.reset()
+            self._idle.put(borrowed)
+
+    def run(self, program: Program) -> BatchResult:
+        """Run one program on a borrowed interpreter"""
+        with self.interpreter() as interpreter:
+            start_time = time.perf_counter()
+            try:
+                if isinstance(program, dict):
+                    result = interpreter.exec_ingested(program)
+                else:
+                    result = interpreter.exec(program)
+                error = None
+            except Exception as e:
+                result = None
+                error = f"{type(e).__name__}: {e}"
+            seconds = time.perf_counter() - start_time
+            return BatchResult(result, interpreter.output.getvalue(), seconds, error)
+
+
+def run_batch(programs: Iterable[Program], workers: int = 1, engine: str = 'tree',
+              pool: Optional[InterpreterPool] = None, **options) -> List[BatchResult]:
+    """Run each program on a clean interpreter, returning results in order
+
+    With workers > 1 the jobs are spread over threads, each with its own
+    interpreter. Pass a pool to keep its interpreters warm across batches,
+    or options for the interpreters of a new pool (budget, trace, ...).
+    A job cut off by its budget has a BudgetExceeded error.
+    """
+    if pool is None:
+        pool = InterpreterPool(ENGINES[engine], **options)
+    if workers <= 1:
+        return [pool.run(program) for program in programs]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(pool.run, programs))
+
+
+# Pool of the current worker process of run_parallel
+_process_pool: Optional[InterpreterPool] = None
+
+
+def _start_worker(engine: str, options: Dict[str, Any]):
+    global _process_pool
+    _process_pool = InterpreterPool(ENGINES[engine], **options)
+
+
+def _run_in_worker(program: Program) -> BatchResult:
+    return _process_pool.run(program)
+
+
+def run_parallel(programs: Iterable[Program], jobs: Optional[int] = None, engine: str = 'tree',
+                 chunksize: Optional[int] = None, **options) -> List[BatchResult]:
+    """Run each program on a clean interpreter in worker processes
+
+    jobs is the number of processes (one per core by default). Programs
+    are best given as ingest_program results, so workers skip parsing.
+    They are sent in chunks to cut the cost of inter-process messages.
+    Results, including captured output, come back in order. options are
+    passed on to the interpreters (trace, budget, ...).
+    """
+    programs = list(programs)
+    jobs = jobs or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(programs) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_start_worker,
+                             initargs=(engine, options)) as executor:
+        return list(executor.map(_run_in_worker, programs, chunksize=chunksize))
+
+
+def latency_summary(results: List[BatchResult]) -> Dict[str, float]:
+    """Count, total, mean, median, 95th percentile and maximum job seconds"""
+    seconds = sorted(result.seconds for result in results)
+    if not seconds:
+        return {'jobs': 0}
+    return {
+        'jobs': len(seconds),
+        'total': sum(seconds),
+        'mean': statistics.mean(seconds),
+        'median': statistics.median(seconds),
+        'p95': seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))],
+        'max': seconds[-1],
+    }
+
+
+def main():
+    """Compare run_batch and run_parallel with a new interpreter per job"""
+    jobs = 2000
+    programs = [
+        [f'print "job-{i}"', f'{i % 10 + 1} times pass', f'( {i} + 1 ) * 2',
+         '[ 1 2 3 4 5 ] each print each_item'][i % 4]
+        for i in range(jobs)
+    ]
+
+    start_time = time.perf_counter()
+    for program in programs:
+        PangeaInterpreter(output=OutputBuffer(capture=True)).exec(program)
+    fresh_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    results = run_batch(programs)
+    batch_seconds = time.perf_counter() - start_time
+
+    ingested = [PangeaInterpreter.ingest_program(program) for program in programs]
+    start_time = time.perf_counter()
+    parallel_results = run_parallel(ingested)
+    parallel_seconds = time.perf_counter() - start_time
+    assert [r.output for r in parallel_results] == [r.output for r in results]
+
+    summary = latency_summary(results)
+    print(f"{jobs} jobs, new interpreter each: {jobs / fresh_seconds:.0f} jobs/s")
+    print(f"{jobs} jobs, run_batch: {jobs / batch_seconds:.0f} jobs/s")
+    print(f"{jobs} jobs, run_parallel on {os.cpu_count()} cores: {jobs / parallel_seconds:.0f} jobs/s")
+    print(f"Latency median {summary['median'] * 1e6:.1f} µs, "
+          f"p95 {summary['p95'] * 1e6:.1f} µs, max {summary['max'] * 1e6:.1f} µs")
+    failures = [result for result in results if result.error]
+    if failures:
+        print(f"{len(failures)} jobs failed, first: {failures[0].error}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,34 @@
 Pangea REPL - Interactive command line interface for the Pangea interpreter
 """
 
+import os
 import sys
+import glob
 import argparse
 from pangea_python_interpreter import PangeaInterpreter
+from pangea_vm import PangeaVM
+from source_loading import mapped_lines, peak_rss
+from program_cache import load_program
+from pangea_batch import run_parallel
+from pangea_profiler import Profiler
 
 
-def run_file(filename):
-    """Run a Pangea file"""
+# Execution engines selectable with --engine
+ENGINES = {
+    'tree': PangeaInterpreter,
+    'vm': PangeaVM,
+}
+
+
+def run_file(filename, engine='tree', trace=False, use_cache=True, profiler=None):
+    """Run a Pangea file, parsed program cached in __pangea_cache__/ unless use_cache is off"""
     try:
-        with open(filename, 'r') as f:
-            code = f.read()
-        
-        interpreter = PangeaInterpreter()
-        interpreter.exec(code)
+        interpreter = ENGINES[engine](trace=trace, profiler=profiler)
+        if use_cache:
+            interpreter.exec_ingested(load_program(filename, ENGINES[engine]))
+        else:
+            interpreter.exec(mapped_lines(filename))
+        return interpreter
         
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
@@ -25,13 +40,37 @@ def run_file(filename):
         sys.exit(1)
 
 
-def run_repl():
+def run_directory(directory, engine='tree', trace=False, use_cache=True, jobs=None):
+    """Run every .pangea file of a directory in worker processes
+    
+    Files are parsed (or loaded from the cache) here and sent to the
+    workers pre-tokenized. Their outputs are printed in file name order.
+    """
+    interpreter_class = ENGINES[engine]
+    paths = sorted(glob.glob(os.path.join(directory, '*.pangea')))
+    if use_cache:
+        programs = [load_program(path, interpreter_class) for path in paths]
+    else:
+        programs = [interpreter_class.ingest_program(mapped_lines(path)) for path in paths]
+    
+    failed = False
+    for path, result in zip(paths, run_parallel(programs, jobs, engine, trace=trace)):
+        print(f"==> {path} <==")
+        sys.stdout.write(result.output)
+        if result.error:
+            print(f"Error executing file: {result.error}")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+def run_repl(engine='tree', trace=False):
     """Run interactive REPL"""
     print("Pangea Python Interpreter REPL")
     print("Type 'help' for help, 'exit' to quit")
     print("=" * 40)
     
-    interpreter = PangeaInterpreter()
+    interpreter = ENGINES[engine](trace=trace)
     
     while True:
         try:
@@ -49,7 +88,7 @@ def run_repl():
                 continue
             
             if code.lower() == 'reset':
-                interpreter = PangeaInterpreter()
+                interpreter = ENGINES[engine](trace=trace)
                 print("Interpreter reset.")
                 continue
             
@@ -154,33 +193,77 @@ Try copying and pasting these examples!
     print(examples)
 
 
-def run_code(code):
+def run_code(code, engine='tree', trace=False, profiler=None):
     """Run a single line of code"""
-    interpreter = PangeaInterpreter()
+    interpreter = ENGINES[engine](trace=trace, profiler=profiler)
     interpreter.exec(code)
+    return interpreter
 
 
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='Pangea Python Interpreter')
-    parser.add_argument('file', nargs='?', help='Pangea file to execute')
+    parser.add_argument('file', nargs='?', help='Pangea file, or directory of .pangea files, to execute')
     parser.add_argument('-c', '--code', help='Execute code directly')
     parser.add_argument('-i', '--interactive', action='store_true', 
                        help='Start interactive REPL after running file/code')
+    parser.add_argument('-e', '--engine', choices=sorted(ENGINES), default='tree',
+                       help='Execution engine: closure tree walker or bytecode VM')
+    parser.add_argument('-t', '--trace', action='store_true',
+                       help='Show the words and phrase lengths of each executed segment')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                       help='Report peak memory use when done')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Parse the file afresh, without reading or writing __pangea_cache__/')
+    parser.add_argument('-j', '--jobs', type=int,
+                       help='Worker processes for a directory of files (default: one per core)')
+    parser.add_argument('-p', '--profile', action='store_true',
+                       help='Report time and calls per word, function and call site to stderr')
+    parser.add_argument('--profile-stacks', default='pangea_profile.collapsed', metavar='PATH',
+                       help='Collapsed stacks file written by --profile, for flamegraph tools')
     
     args = parser.parse_args()
+    if args.profile and args.engine != 'tree':
+        parser.error('--profile times the tree engine\'s compiled calls; use --engine tree')
+    profiler = Profiler() if args.profile else None
+    interpreter = None
     
     # Execute file if provided
-    if args.file:
-        run_file(args.file)
+    if args.file and os.path.isdir(args.file):
+        run_directory(args.file, args.engine, args.trace, not args.no_cache, args.jobs)
+    elif args.file:
+        interpreter = run_file(args.file, args.engine, args.trace, not args.no_cache, profiler)
     
     # Execute code if provided
     elif args.code:
-        run_code(args.code)
+        interpreter = run_code(args.code, args.engine, args.trace, profiler)
+    
+    if profiler is not None and interpreter is not None:
+        report_profile(profiler, interpreter, args.profile_stacks)
     
     # Start REPL if requested or no other action
     if args.interactive or (not args.file and not args.code):
-        run_repl()
+        run_repl(args.engine, args.trace)
+    
+    if args.verbose:
+        report_memory()
+
+
+def report_profile(profiler, interpreter, stacks_path):
+    """Print the profile report to stderr and write its collapsed stacks"""
+    print(profiler.report(interpreter), file=sys.stderr)
+    with open(stacks_path, 'w') as f:
+        profiler.write_collapsed(f)
+    print(f"Collapsed stacks written to {stacks_path}", file=sys.stderr)
+
+
+def report_memory():
+    """Print the peak resident set size of the process to stderr"""
+    peak = peak_rss()
+    if peak is None:
+        print("Peak RSS: unavailable on this platform", file=sys.stderr)
+    else:
+        print(f"Peak RSS: {peak / (1024 * 1024):.1f} MiB", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Metrics for the Pangea Python Interpreter
+Counters of the work an interpreter does, published per execution
+
+An interpreter constructed with metrics=Metrics() counts:
+
+- builtin.<word>: calls of a built-in function or operator
+- function.<name>: calls of a user function
+- phrase_length.hits / phrase_length.misses: phrase length cache lookups
+- json_failures: words whose JSON decoding failed and was ignored
+- opcode.<NAME>: instructions executed by PangeaVM (built-ins the VM
+  lowers to instructions are counted here rather than as builtin.<word>)
+- executions: exec calls finished, successfully or not
+
+Calls are counted by wrappers added when a call site is compiled, so an
+interpreter without metrics runs unchanged closures. After every exec
+call the counts it added are handed to each listener, e.g. to feed a
+monitoring system.
+"""
+
+from typing import Callable, Dict, List
+
+
+class Metrics:
+    """Counters of an interpreter, with listeners called per execution"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.listeners: List[Callable[[Dict[str, int]], None]] = []
+        # Exceptions raised by listeners, which never reach the program
+        self.listener_errors = 0
+        self._published: Dict[str, int] = {}
+
+    def count(self, name: str, amount: int = 1):
+        """Add to a counter"""
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def counter(self, name: str, node: Callable):
+        """Wrap a compiled closure to count its calls under name"""
+        counts = self.counts
+        counts.setdefault(name, 0)
+
+        def counted():
+            counts[name] += 1
+            return node()
+        return counted
+
+    def snapshot(self) -> Dict[str, int]:
+        """Copy of the counters counted since creation or the last reset()"""
+        return {name: value for name, value in self.counts.items() if value}
+
+    def reset(self):
+        """Zero all counters, which compiled calls keep counting into"""
+        for name in self.counts:
+            self.counts[name] = 0
+        self._published.clear()
+
+    def add_listener(self, callback: Callable[[Dict[str, int]], None]):
+        """Call callback with the counts each execution adds"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Dict[str, int]], None]):
+        self.listeners.remove(callback)
+
+    def execution_finished(self):
+        """Publish the counts added since the previous execution finished"""
+        self.count('executions')
+        published = self._published
+        delta = {name: value - published.get(name, 0)
+                 for name, value in self.counts.items() if value != published.get(name, 0)}
+        self._published = dict(self.counts)
+        for callback in list(self.listeners):
+            try:
+                callback(delta)
+            except Exception:
+                self.listener_errors += 1
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Profiler for the Pangea Python Interpreter
+Time and call counts per Pangea word, user function and call site
+
+An interpreter constructed with profiler=Profiler() wraps the closure of
+every call it compiles (built-ins, operators and user functions), so
+nothing is measured, or slowed down, without one. Each wrapped call is
+timed and recorded under its word, under its call site (word index) and
+in a tree of call stacks. From these come a sorted report and collapsed
+stacks ("outer;inner;word microseconds" lines) for flamegraph tools.
+
+A user function called in tail position runs in the frame of its caller,
+so its time after the first, non-tail call counts towards that call.
+Stacks deeper than max_stack_depth are folded into their deepest kept
+frame, keeping the collapsed stacks of deep recursion to a sane size.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, TextIO
+
+
+class _StackNode:
+    """A call stack of the profile, with the time spent in it alone"""
+
+    __slots__ = ('children', 'own')
+
+    def __init__(self):
+        self.children: Dict[str, '_StackNode'] = {}
+        self.own = 0.0
+
+
+class Profiler:
+    """Deterministic profile of the Pangea calls of one interpreter"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter, max_stack_depth: int = 100):
+        self.clock = clock
+        self.max_stack_depth = max_stack_depth
+        # word -> [calls, total seconds (outermost calls only), own seconds]
+        self.words: Dict[str, List[float]] = {}
+        # word index -> [calls, total seconds]
+        self.sites: Dict[int, List[float]] = {}
+        self.root = _StackNode()
+        # Active calls: stack node and time spent in calls made from it
+        self._frames: List[list] = [[self.root, 0.0]]
+        self._active: Dict[str, int] = {}
+
+    def wrap(self, word: str, word_index: int, node: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap the compiled closure of a call of word made at word_index"""
+        clock = self.clock
+        frames = self._frames
+        active = self._active
+        max_depth = self.max_stack_depth
+        word_stats = self.words.setdefault(word, [0, 0.0, 0.0])
+        site_stats = self.sites.setdefault(word_index, [0, 0.0])
+
+        def profiled():
+            parent = frames[-1]
+            if len(frames) > max_depth:
+                stack_node = parent[0]
+            else:
+                stack_node = parent[0].children.get(word)
+                if stack_node is None:
+                    stack_node = parent[0].children[word] = _StackNode()
+            frame = [stack_node, 0.0]
+            frames.append(frame)
+            active[word] = active.get(word, 0) + 1
+            start = clock()
+            try:
+                return node()
+            finally:
+                elapsed = clock() - start
+                frames.pop()
+                active[word] -= 1
+                own = elapsed - frame[1]
+                parent[1] += elapsed
+                stack_node.own += own
+                word_stats[0] += 1
+                word_stats[2] += own
+                site_stats[0] += 1
+                if not active[word]:
+                    # Recursive calls are already inside this one's time
+                    word_stats[1] += elapsed
+                    site_stats[1] += elapsed
+        return profiled
+
+    def stacks(self) -> List[tuple]:
+        """(call stack, own seconds) of every call stack, outermost first
+
+        Walked without recursion, as Pangea recursion can be far deeper
+        than Python's.
+        """
+        result = []
+        pending = [(child, word) for word, child in reversed(self.root.children.items())]
+        while pending:
+            node, path = pending.pop()
+            result.append((path, node.own))
+            pending.extend((child, f"{path};{word}") for word, child in reversed(node.children.items()))
+        return result
+
+    def total(self) -> float:
+        """Seconds spent in profiled calls"""
+        return sum(own for _, own in self.stacks())
+
+    def collapsed_stacks(self) -> List[str]:
+        """One "outer;inner microseconds" line per call stack with own time"""
+        lines = []
+        for path, own in self.stacks():
+            microseconds = round(own * 1e6)
+            if microseconds > 0:
+                lines.append(f"{path} {microseconds}")
+        return lines
+
+    def write_collapsed(self, stream: TextIO):
+        """Write the collapsed stacks, as read by flamegraph.pl or speedscope"""
+        for line in self.collapsed_stacks():
+            stream.write(line + "\n")
+
+    def report(self, interpreter: Any = None, limit: int = 20) -> str:
+        """Format the hottest words and call sites, by total time
+
+        Given the profiled interpreter, call sites show their code and user
+        functions are labelled with their arity.
+        """
+        namespace = interpreter.namespace if interpreter is not None else {}
+        total = self.total()
+        lines = [f"Pangea profile: {total * 1000:.3f} ms in profiled calls", "",
+                 f"{'calls':>10} {'total ms':>10} {'own ms':>10}  word"]
+        ranked = sorted(self.words.items(), key=lambda item: (-item[1][1], item[0]))
+        for word, (calls, word_total, own) in ranked[:limit]:
+            if not calls:
+                continue
+            entry = namespace.get(word)
+            if isinstance(entry, dict) and 'invoke' in entry:
+                word = f"{word}#{entry['arity']} (function)"
+            lines.append(f"{calls:>10} {word_total * 1000:>10.3f} {own * 1000:>10.3f}  {word}")
+
+        lines += ["", f"{'calls':>10} {'total ms':>10}  call site"]
+        ranked_sites = sorted(self.sites.items(), key=lambda item: (-item[1][1], item[0]))
+        for word_index, (calls, site_total) in ranked_sites[:limit]:
+            if not calls:
+                continue
+            code = self._site_code(interpreter, word_index) if interpreter is not None else ''
+            lines.append(f"{calls:>10} {site_total * 1000:>10.3f}  #{word_index} {code}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _site_code(interpreter: Any, word_index: int, max_words: int = 8) -> str:
+        """The words of the phrase at a call site, shortened to max_words"""
+        length = interpreter.phrase_lengths[word_index] or 1
+        words = interpreter.words[word_index:word_index + min(length, max_words)]
+        return ' '.join(words) + (' ...' if length > max_words else '')
@@ -9,44 +9,410 @@ This interpreter implements a stack-based language with:
 - Control flow (if, times, each)
 - Arrays and objects
 - Function calls with arguments
+
+Words are compiled lazily into a tree of closures (literal, call, infix,
+block) the first time they run, so loop bodies and recursive functions
+do not re-analyse their words on every evaluation. Built-in operators
+whose operands are all literals are folded into a single constant as
+they are compiled. User function calls in tail position (if/when/unless
+branches) run in the caller's frame rather than a nested Python call.
 """
 
+import io
 import re
+import sys
 import json
-from typing import List, Dict, Any, Optional, Union, Callable
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Union, Callable, TextIO, Tuple, Iterable, Iterator, Awaitable
+
+from execution_budget import ExecutionBudget
+from pangea_profiler import Profiler
+from pangea_metrics import Metrics
+
+
+# Word kinds, classified once per distinct word when code is ingested
+WORD_LITERAL = 'literal'          # number, string, true/false/null
+WORD_JSON = 'json'                # array/object literal, decoded per use
+WORD_OPEN = 'open'                # ( [ {
+WORD_CLOSE = 'close'              # ) ] }
+WORD_DEFINITION = 'definition'    # name#arity
+WORD_IDENTIFIER = 'identifier'
+
+# Version of the ingest_program format and of the tokenizing, classifying
+# and measuring behind it; cached programs of another version are ignored
+INGEST_VERSION = 2
+
+# Built-ins whose result depends only on their operands, used to decide
+# whether a user function can be memoized (binary operators carrying an
+# 'operation' are pure as well)
+PURE_BUILTINS = frozenset([
+    'when', 'times', 'arg', 'if', 'unless', 'dont', 'comment', 'pass',
+    'greater', '>', 'squared', 'exponent', '**', 'each',
+])
+
+
+# A quoted string (which may run on past the end of the line) or a bare word
+_TOKEN_PATTERN = re.compile(r'"[^"]*("|$)|[^\s"]+')
+
+
+class Token:
+    """A word of Pangea source and the line and column it starts at
+    
+    string holds the decoded value of a string literal, None otherwise.
+    """
+    
+    __slots__ = ('word', 'line', 'column', 'string')
+    
+    def __init__(self, word: str, line: int, column: int, string: Optional[str] = None):
+        self.word = word
+        self.line = line
+        self.column = column
+        self.string = string
+    
+    def __repr__(self):
+        return f"Token({self.word!r}, {self.line}, {self.column})"
+
+
+def _string_token(text: str, line: int, column: int) -> Token:
+    """Decode a string literal, applying the (+) space syntax
+    
+    Inside strings "+" stands for a space and "(+)" for a plus sign; the
+    word is re-encoded so that it decodes to the converted text.
+    """
+    inner = text[1:-1]
+    if '\\' not in inner and inner.isascii() and inner.isprintable():
+        # Plain text decodes to itself
+        if '+' not in inner:
+            return Token(text, line, column, inner)
+        value = '+'.join(part.replace('+', ' ') for part in inner.split('(+)'))
+        return Token(f'"{value}"', line, column, value)
+    
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return Token(text, line, column)
+    value = '+'.join(part.replace('+', ' ') for part in value.split('(+)'))
+    return Token(json.dumps(value), line, column, value)
+
+
+def tokenize(source: Union[str, Iterable[str]]) -> Iterator[Token]:
+    """Split Pangea source into tokens, reading it a line at a time
+    
+    source is a string or an iterable of lines such as an open text file.
+    Blank lines and lines starting with # are skipped. A string literal
+    left open at the end of a line continues on the next one, joined by
+    a space.
+    """
+    lines = io.StringIO(source) if isinstance(source, str) else source
+    # Text, line and column of a string literal still open at a line end
+    pending = None
+    
+    for line_number, raw_line in enumerate(lines, 1):
+        line = raw_line.strip()
+        if not line or line.startswith('#'):
+            continue
+        offset = len(raw_line) - len(raw_line.lstrip())
+        position = 0
+        
+        if pending is not None:
+            end = line.find('"')
+            if end < 0:
+                pending[0].append(line)
+                continue
+            pending[0].append(line[:end + 1])
+            yield _string_token(' '.join(pending[0]), pending[1], pending[2])
+            pending = None
+            position = end + 1
+        
+        for match in _TOKEN_PATTERN.finditer(line, position):
+            text = match.group()
+            column = offset + match.start() + 1
+            if text[0] == '"':
+                if match.group(1):
+                    yield _string_token(text, line_number, column)
+                else:
+                    pending = ([text], line_number, column)
+            elif match.end() < len(line) and line[match.end()] == '"':
+                # A word running into an opening quote is replaced by the string
+                continue
+            else:
+                yield Token(text, line_number, column)
+    
+    if pending is not None:
+        # Unterminated strings are passed through undecoded
+        yield Token(' '.join(pending[0]), pending[1], pending[2])
+
+
+class OutputBuffer:
+    """List-backed writer for interpreter output
+    
+    Text written while code runs is kept in memory and handed to the
+    stream in a single write by flush(), which exec() calls when it
+    finishes. With capture=True nothing is written anywhere and the text
+    accumulates for getvalue().
+    """
+    
+    # Pending text above this size is flushed early to bound memory
+    flush_threshold = 1 << 16
+    
+    # Whether flush() returns an awaitable, so only exec_async can run code
+    asynchronous = False
+    
+    def __init__(self, stream: Optional[TextIO] = None, capture: bool = False):
+        self.stream = stream
+        self.capture = capture
+        self._chunks: List[str] = []
+        self._size = 0
+        # Characters written over the buffer's lifetime
+        self.written = 0
+    
+    def write(self, text: str):
+        self._chunks.append(text)
+        self._size += len(text)
+        self.written += len(text)
+        if self._size > self.flush_threshold and not self.capture:
+            self.flush()
+    
+    def flush(self):
+        """Write pending text to the stream (sys.stdout by default)"""
+        if self.capture or not self._chunks:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(''.join(self._chunks))
+        stream.flush()
+        self.clear()
+    
+    def getvalue(self) -> str:
+        return ''.join(self._chunks)
+    
+    def clear(self):
+        self._chunks.clear()
+        self._size = 0
+
+
+class AsyncOutputBuffer(OutputBuffer):
+    """Output buffer whose flush hands the pending text to a coroutine
+    
+    For PangeaVM.exec_async, which awaits what flush() returns, e.g.
+    AsyncOutputBuffer(send) with an async def send(text) writing to an
+    asyncio stream. Text is only sent when flushed, never from write().
+    Plain exec() calls refuse it, as they cannot await the flush.
+    """
+    
+    asynchronous = True
+    
+    def __init__(self, send: Callable[[str], Awaitable[Any]]):
+        super().__init__()
+        self.send = send
+    
+    def write(self, text: str):
+        self._chunks.append(text)
+        self._size += len(text)
+        self.written += len(text)
+    
+    def flush(self) -> Optional[Awaitable[Any]]:
+        """Hand pending text to send, returning its awaitable"""
+        if not self._chunks:
+            return None
+        text = self.getvalue()
+        self.clear()
+        return self.send(text)
+
+
+# Marks a call site whose namespace entry has not been looked up yet
+_UNRESOLVED = object()
+
+# Returned by fold_constant when an expression is left to run time
+_NOT_CONSTANT = object()
+
+
+class CallFrame:
+    """A user function call's entry on namespace['stack']"""
+    
+    __slots__ = ('args',)
+    
+    def __init__(self, args: List[Any]):
+        self.args = args
+
+
+class TimesCounter:
+    """A running times loop's entry on namespace['times_stack']"""
+    
+    __slots__ = ('count',)
+    
+    def __init__(self, count: int = 1):
+        self.count = count
+
+
+class _Thunk:
+    """An argument left unevaluated until arg first reads it
+    
+    The depths of the frame, times and each stacks at the call are kept
+    so that the argument is evaluated in its caller's context, along with
+    the caller's arguments, which a tail call replaces in its frame.
+    """
+    
+    __slots__ = ('node', 'frames', 'times', 'each', 'args')
+    
+    def __init__(self, node: Callable[[], Any], frames: int, times: int, each: int,
+                 args: Optional[List[Any]]):
+        self.node = node
+        self.frames = frames
+        self.times = times
+        self.each = each
+        self.args = args
+
+
+class _TailCall:
+    """A user function call in tail position, run by the caller's invoke loop"""
+    
+    __slots__ = ('entry', 'args')
+    
+    def __init__(self, entry: Dict[str, Any], args: List[Any]):
+        self.entry = entry
+        self.args = args
+
+# Operand types that built-in operators are folded over at compile time
+_FOLDABLE_TYPES = (int, float, bool)
+
+# Largest exponent folded at compile time, so folding itself stays cheap
+FOLD_MAX_EXPONENT = 256
+
+
+def small_exponent(base: Any, exp: Any) -> bool:
+    """Whether base ** exp is cheap enough to fold"""
+    return abs(exp) <= FOLD_MAX_EXPONENT
+
+
+def fold_constant(operation: Callable, values: List[Any],
+                  foldable: Optional[Callable[..., bool]] = None) -> Any:
+    """Apply a built-in operation to literal operands ahead of time
+    
+    Only plain numbers and booleans are folded. An operation that raises
+    is left to raise at run time, as if it had not been folded.
+    """
+    if not all(type(value) in _FOLDABLE_TYPES for value in values):
+        return _NOT_CONSTANT
+    if foldable is not None and not foldable(*values):
+        return _NOT_CONSTANT
+    try:
+        return operation(*values)
+    except Exception:
+        return _NOT_CONSTANT
 
 
 class PangeaInterpreter:
-    def __init__(self):
+    # Results kept per memoized function before the least recently used
+    # ones are evicted
+    memo_size = 1024
+    
+    # Distinct words whose classification reset() keeps memoized
+    word_class_limit = 1 << 16
+    
+    def __init__(self, output: Optional[OutputBuffer] = None, trace: bool = False,
+                 auto_memoize: bool = False, lazy_args: bool = False,
+                 budget: Optional[ExecutionBudget] = None, profiler: Optional[Profiler] = None,
+                 metrics: Optional[Metrics] = None):
+        # Destination of print and diagnostics; trace adds the per-call
+        # words/phrase lengths dump
+        self.output = output if output is not None else OutputBuffer()
+        self.trace = trace
+        # Limits applied afresh to each exec call
+        self.budget = budget
+        # Times the calls compiled from here on; never consulted at run time
+        self.profiler = profiler
+        # Counts calls, phrase length lookups and JSON failures, published
+        # to its listeners after each exec call
+        self.metrics = metrics
+        # Memoize every function found to be pure, not only def_pure ones
+        self.auto_memoize = auto_memoize
+        # Pass user function arguments as thunks forced by arg
+        self.lazy_args = lazy_args
+        self._memo_caches: List[OrderedDict] = []
+        # Functions memoized by auto_memoize: name -> (body index, plain
+        # entry), re-checked whenever a function is redefined
+        self._auto_memoized: Dict[str, Tuple[int, Dict[str, Any]]] = {}
         self.words: List[str] = ["("]  # Begin sequence
-        self.phrase_lengths: List[int] = []
-        self.namespace = {
+        self.phrase_lengths: List[int] = [0]
+        # Phrase lengths without a trailing infix/postfix operator
+        self.operand_lengths: List[int] = [0]
+        # Kind and decoded literal value of every word, parallel to words
+        self.word_kinds: List[str] = [WORD_OPEN]
+        self.word_values: List[Any] = [None]
+        self._word_classes: Dict[str, Tuple[str, Any]] = {}
+        # Compiled closures keyed by word index, for full phrases and for
+        # operands (the skip_operator view used by infix/postfix operators)
+        self._compiled: Dict[int, Callable[[], Any]] = {}
+        self._compiled_operands: Dict[int, Callable[[], Any]] = {}
+        # Closures compiled for tail position in a function body, keyed by
+        # (word index, skip_operator); their user function calls return a
+        # _TailCall instead of recursing
+        self._compiled_tails: Dict[Tuple[int, bool], Callable[[], Any]] = {}
+        # Value of every compiled closure that always returns a constant
+        self._constants: Dict[Callable[[], Any], Any] = {}
+        self.namespace = self._runtime_state()
+        
+        # Initialize built-in functions
+        self._init_builtin_functions()
+        # Built-in entries as constructed, restored by reset()
+        self._builtins = dict(self.namespace)
+    
+    @staticmethod
+    def _runtime_state() -> Dict[str, Any]:
+        """Namespace entries holding the state of running code"""
+        return {
             'arities': {},
-            'stack': [{}],
+            'stack': [CallFrame([])],
             'times_stack': [],
             'each_stack': [],
         }
+    
+    def reset(self):
+        """Forget all code and definitions, as if freshly constructed
         
-        # Initialize built-in functions
-        self._init_builtin_functions()
+        The built-in entries (including keys subclasses added to them) are
+        kept rather than rebuilt, as is the word classification memo unless
+        it has grown past word_class_limit. Pending output is discarded.
+        """
+        del self.words[1:]
+        del self.phrase_lengths[1:]
+        del self.operand_lengths[1:]
+        del self.word_kinds[1:]
+        del self.word_values[1:]
+        if len(self._word_classes) > self.word_class_limit:
+            self._word_classes.clear()
+        self._compiled.clear()
+        self._compiled_operands.clear()
+        self._compiled_tails.clear()
+        self._constants.clear()
+        self._memo_caches.clear()
+        self._auto_memoized.clear()
+        self.namespace.clear()
+        self.namespace.update(self._builtins)
+        self.namespace.update(self._runtime_state())
+        self.output.clear()
     
     def _init_builtin_functions(self):
         """Initialize all built-in functions and operators"""
         
         # Basic functions
         builtin_funcs = {
-            'print': {'func': self._print, 'arity': 1},
-            'when': {'func': self._when, 'arity': 2, 'operator': 'infix'},
-            'times': {'func': self._times, 'arity': 1, 'operator': 'infix'},
+            'print': {'func': self._print, 'arity': 1, 'compile': self._compile_print},
+            'when': {'func': self._when, 'arity': 2, 'operator': 'infix', 'compile': self._compile_when,
+                     'compile_tail': self._compile_when_tail},
+            'times': {'func': self._times, 'arity': 1, 'operator': 'infix', 'compile': self._compile_times},
             'def': {'func': self._def, 'arity': 2},
-            'arg': {'func': self._arg, 'arity': 1},
-            'if': {'func': self._if3, 'arity': 3},
-            'unless': {'func': self._unless, 'arity': 1, 'operator': 'infix'},
-            'dont': {'func': self._dont, 'arity': 1},
-            'pass': {'func': self._pass, 'arity': 0},
-            'times_count': {'func': self._times_count, 'arity': 1},
-            'greater': {'func': self._greater, 'arity': 1, 'operator': 'infix'},
-            'squared': {'func': self._squared, 'arity': 0, 'operator': 'postfix'},
+            'def_pure': {'func': self._def_pure, 'arity': 2},
+            'arg': {'func': self._arg, 'arity': 1, 'compile': self._compile_arg},
+            'if': {'func': self._if3, 'arity': 3, 'compile': self._compile_if3,
+                   'compile_tail': self._compile_if3_tail},
+            'unless': {'func': self._unless, 'arity': 1, 'operator': 'infix', 'compile': self._compile_unless,
+                       'compile_tail': self._compile_unless_tail},
+            'dont': {'func': self._dont, 'arity': 1, 'compile': self._compile_nothing},
+            'pass': {'func': self._pass, 'arity': 0, 'compile': self._compile_nothing},
+            'times_count': {'func': self._times_count, 'arity': 1, 'compile': self._compile_times_count},
+            'greater': {'func': self._greater, 'arity': 1, 'operator': 'infix', 'compile': self._compile_greater},
+            'squared': {'func': self._squared, 'arity': 0, 'operator': 'postfix', 'compile': self._compile_squared},
             'each': {'func': self._each, 'arity': 1, 'operator': 'infix'},
             'each_item': {'func': self._each_item, 'arity': 0},
             'each_item_i': {'func': self._each_item_i, 'arity': 1},
@@ -69,7 +435,8 @@ class PangeaInterpreter:
         self._add_binary_operator('modulus', '%', lambda a, b: a % b)
         
         # Exponent operator
-        builtin_funcs['exponent'] = {'func': self._exponent, 'arity': 1, 'operator': 'infix'}
+        builtin_funcs['exponent'] = {'func': self._exponent, 'arity': 1, 'operator': 'infix',
+                                     'compile': self._compile_exponent}
         builtin_funcs['**'] = builtin_funcs['exponent']
         
         # Initialize namespace
@@ -83,93 +450,168 @@ class PangeaInterpreter:
             right = self.word_exec(params[1])
             return operation(left, right)
         
+        def compile_operator(params):
+            left = self._node(params[0], True)
+            right = self._node(params[1])
+            folded = self._fold(operation, [left, right])
+            if folded is not None:
+                return folded
+            return lambda: operation(left(), right())
+        
         entry = {
             'func': operator_func,
             'arity': 1,
-            'operator': 'infix'
+            'operator': 'infix',
+            'compile': compile_operator,
+            'operation': operation
         }
         
         self.namespace[name] = entry
         self.namespace[symbol] = entry
     
-    def parse_code(self, code: str) -> List[str]:
-        """Parse code into words, handling special string formatting and comments"""
-        # Remove comments (lines starting with #)
-        lines = code.split('\n')
-        filtered_lines = []
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                filtered_lines.append(line)
+    def parse_code(self, code: Union[str, Iterable[str]]) -> List[str]:
+        """Parse code into words, handling special string formatting and comments
         
-        code = ' '.join(filtered_lines)
-        
-        # Parse words while preserving quoted strings
+        code may be a string or an iterable of lines such as a text stream. String literals are
+        decoded once here and their classification cached for _ingest.
+        """
         words = []
-        in_string = False
-        current_word = ""
-        i = 0
-        
-        while i < len(code):
-            char = code[i]
-            
-            if char == '"' and not in_string:
-                # Start of string
-                in_string = True
-                current_word = '"'
-            elif char == '"' and in_string:
-                # End of string
-                in_string = False
-                current_word += '"'
-                words.append(current_word)
-                current_word = ""
-            elif in_string:
-                # Inside string
-                current_word += char
-            elif char.isspace():
-                # Space outside string
-                if current_word:
-                    words.append(current_word)
-                    current_word = ""
-            else:
-                # Regular character
-                current_word += char
-            
-            i += 1
-        
-        # Add final word if any
-        if current_word:
-            words.append(current_word)
-        
-        return [self._handle_plus(word) for word in words if word]
+        word_classes = self._word_classes
+        for token in tokenize(code):
+            if token.string is not None and token.word not in word_classes:
+                word_classes[token.word] = (WORD_LITERAL, token.string)
+            words.append(token.word)
+        return words
     
     def _handle_plus(self, word: str) -> str:
         """Handle special string formatting with (+) syntax"""
-        if not self._is_string(word):
+        if not word.startswith('"') or not self._is_string(word):
             return word
+        return _string_token(word, 0, 0).word
+    
+    def exec(self, code: Union[str, Iterable[str]]) -> Any:
+        """Execute Pangea code, given as a string or an iterable of lines"""
+        self._check_sync_output()
+        try:
+            if self.trace:
+                self._write(f"Executing: {code if isinstance(code, str) else '<stream>'}")
+            
+            return self._run_segment(self._ingest(self.parse_code(code)))
+        finally:
+            self.output.flush()
+    
+    @classmethod
+    def ingest_program(cls, code: Union[str, Iterable[str]]) -> Dict[str, Any]:
+        """Tokenize, classify and measure a program as a fresh interpreter would
+        
+        The result holds only lists of plain values, so it can be saved
+        and later run by exec_ingested without parsing the source again.
+        Diagnostics written while measuring are kept as messages.
+        """
+        scratch = cls(output=OutputBuffer(capture=True))
+        start_index = scratch._ingest(scratch.parse_code(code))
+        return {
+            'words': scratch.words[start_index:],
+            'kinds': scratch.word_kinds[start_index:],
+            'values': scratch.word_values[start_index:],
+            'phrase_lengths': scratch.phrase_lengths[start_index:],
+            'operand_lengths': scratch.operand_lengths[start_index:],
+            'arities': [(name, entry['arity'], entry['word'])
+                        for name, entry in scratch.namespace['arities'].items()],
+            'messages': scratch.output.getvalue(),
+        }
+    
+    def exec_ingested(self, program: Dict[str, Any]) -> Any:
+        """Execute a program returned by ingest_program
+        
+        Its phrase lengths were measured against the built-ins alone, so
+        it can only be the first code run by an interpreter.
+        """
+        self._check_sync_output()
+        if len(self.words) != 1:
+            raise ValueError("an ingested program can only run on a fresh interpreter")
         
         try:
-            parsed = json.loads(word)
-            parts = parsed.split("(+)")
-            parts = [part.replace("+", " ") for part in parts]
-            result = "+".join(parts)
-            return json.dumps(result)
-        except:
-            return word
+            if self.trace:
+                self._write("Executing: <ingested>")
+            
+            start_index = len(self.words)
+            self.words.extend(program['words'])
+            self.word_kinds.extend(program['kinds'])
+            self.word_values.extend(program['values'])
+            self.phrase_lengths.extend(program['phrase_lengths'])
+            self.operand_lengths.extend(program['operand_lengths'])
+            for name, arity, word in program['arities']:
+                self.namespace['arities'][name] = {'arity': arity, 'word': word}
+            if program['messages']:
+                self.output.write(program['messages'])
+            
+            return self._run_segment(start_index)
+        finally:
+            self.output.flush()
     
-    def exec(self, code: str) -> Any:
-        """Execute Pangea code"""
-        print(f"Executing: {code}")
+    def _check_sync_output(self):
+        """Refuse to run with output whose flush would have to be awaited"""
+        if self.output.asynchronous:
+            raise TypeError(f"{type(self.output).__name__} output is flushed by awaiting it; "
+                            f"use PangeaVM.exec_async")
+    
+    def _run_segment(self, previous_length: int) -> Any:
+        """Execute the ingested segment starting at previous_length"""
+        self._trace_begin(previous_length)
+        self._start_budget()
         
-        previous_length = len(self.words)
-        parsed_words = self.parse_code(code)
-        self.words.extend(parsed_words)
+        # Execute the new code, unwinding the stacks if it is cut off
+        namespace = self.namespace
+        depths = [(namespace[name], len(namespace[name])) for name in ('stack', 'times_stack', 'each_stack')]
+        try:
+            result = self._execute(previous_length)
+        except BaseException:
+            for items, depth in depths:
+                del items[depth:]
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.execution_finished()
         
-        print(f"Words: {self.words}")
+        if self.trace:
+            self._write("[end]")
+        return result
+    
+    def _start_budget(self):
+        """Reset the budget's counters for a new exec call"""
+        if self.budget is not None:
+            output = self.output
+            self.budget.start(lambda: output.written)
+    
+    def _trace_begin(self, previous_length: int):
+        """Dump the words and phrase lengths of a segment when tracing"""
+        if self.trace:
+            self._write(f"Words: {self.words[previous_length:]}")
+            self._write(f"Phrase lengths: {self.phrase_lengths[previous_length:]}")
+            self._write("[begin]")
+    
+    def _write(self, text: Any):
+        """Write a line to the output buffer"""
+        self.output.write(f"{text}\n")
+    
+    def _ingest(self, parsed_words: List[str]) -> int:
+        """Append a segment of words and measure it, returning its start index
         
-        # Pre-scan for arity definitions
-        for word in self.words:
-            if "#" in word and not self._is_string(word):
+        Only the new segment is scanned: the arity table and phrase lengths
+        are extended, and lengths measured by earlier calls are kept (along
+        with the closures compiled from them).
+        """
+        start_index = len(self.words)
+        self.words.extend(parsed_words)
+        
+        # Classify the words and pre-scan for arity definitions
+        for word in parsed_words:
+            kind, value = self._classify(word)
+            self.word_kinds.append(kind)
+            self.word_values.append(value)
+            
+            if kind == WORD_DEFINITION:
                 parts = word.split("#")
                 if len(parts) == 2:
                     try:
@@ -179,15 +621,45 @@ class PangeaInterpreter:
                     except ValueError:
                         pass
         
-        # Calculate phrase lengths
-        self.phrase_lengths = [0] * len(self.words)
-        self._phrase_length(0)
+        # Calculate phrase lengths of the new top-level statements
+        self.phrase_lengths.extend([0] * len(parsed_words))
+        self.operand_lengths.extend([0] * len(parsed_words))
+        current_idx = start_index
+        while current_idx < len(self.words) and self.words[current_idx] != ")":
+            current_idx += self._phrase_length(current_idx)
         
-        print(f"Phrase lengths: {self.phrase_lengths}")
+        return start_index
+    
+    def _classify(self, word: str) -> Tuple[str, Any]:
+        """Get the kind of a word and its decoded value if it is a literal"""
+        word_class = self._word_classes.get(word)
+        if word_class is not None:
+            return word_class
         
-        # Execute the new code
-        print("[begin]")
-        current_idx = previous_length
+        if word in ("(", "[", "{"):
+            word_class = (WORD_OPEN, None)
+        elif word in (")", "]", "}"):
+            word_class = (WORD_CLOSE, None)
+        else:
+            try:
+                value = json.loads(word)
+            except ValueError:
+                if self.metrics is not None:
+                    self.metrics.count('json_failures')
+                kind = WORD_DEFINITION if "#" in word else WORD_IDENTIFIER
+                word_class = (kind, None)
+            else:
+                if isinstance(value, (list, dict)):
+                    word_class = (WORD_JSON, None)
+                else:
+                    word_class = (WORD_LITERAL, value)
+        
+        self._word_classes[word] = word_class
+        return word_class
+    
+    def _execute(self, start_index: int) -> Any:
+        """Execute the top-level statements starting at start_index"""
+        current_idx = start_index
         result = None
         
         # Execute all statements at the top level
@@ -197,140 +669,385 @@ class PangeaInterpreter:
             result = self.word_exec(current_idx)
             current_idx += self._phrase_length(current_idx)
         
-        print("[end]")
         return result
     
     def word_exec(self, word_index: int, skip_operator: bool = False) -> Any:
         """Execute a word at the given index"""
+        cache = self._compiled_operands if skip_operator else self._compiled
+        node = cache.get(word_index)
+        if node is None:
+            node = self._compile(word_index, skip_operator)
+            if word_index < len(self.words):
+                # Indices past the end are filled in by later exec calls
+                cache[word_index] = node
+        return node()
+    
+    def _node(self, word_index: int, skip_operator: bool = False) -> Callable[[], Any]:
+        """Get the compiled closure for the phrase at word_index"""
+        cache = self._compiled_operands if skip_operator else self._compiled
+        node = cache.get(word_index)
+        if node is None:
+            node = self._compile(word_index, skip_operator)
+            if word_index < len(self.words):
+                # Indices past the end are filled in by later exec calls
+                cache[word_index] = node
+        return node
+    
+    def _compile(self, word_index: int, skip_operator: bool = False) -> Callable[[], Any]:
+        """Compile the phrase at word_index into a closure"""
         if word_index >= len(self.words):
-            print(f"Error: wrong word_index: {word_index}")
-            return None
+            def wrong_index():
+                self._write(f"Error: wrong word_index: {word_index}")
+                return None
+            return wrong_index
         
         word = self.words[word_index]
         
-        def next_index(skip_op: bool = False) -> int:
-            return word_index + self._phrase_length(word_index, skip_op)
-        
         # Handle postfix and infix operators
         if not skip_operator:
-            next_word_idx = next_index(True)
+            next_word_idx = word_index + self._phrase_length(word_index, True)
             if next_word_idx < len(self.words):
-                next_word = self.words[next_word_idx]
-                entry = self.namespace.get(next_word)
+                entry = self.namespace.get(self.words[next_word_idx])
                 
                 if entry and entry.get('operator') == 'postfix':
-                    return entry['func']([word_index])
+                    return self._instrumented(self.words[next_word_idx], word_index, entry,
+                                              self._compile_entry(entry, [word_index]))
                 
                 if entry and entry.get('operator') == 'infix':
-                    arity = entry['arity']
                     params = [word_index]  # First operand
-                    current_idx = word_index + self._phrase_length(word_index, True)
-                    current_idx += 1  # Skip operator
-                    
-                    for _ in range(arity):
-                        params.append(current_idx)
-                        current_idx += self._phrase_length(current_idx)
-                    
-                    return entry['func'](params)
+                    params.extend(self._param_indices(next_word_idx + 1, entry['arity']))
+                    return self._instrumented(self.words[next_word_idx], word_index, entry,
+                                              self._compile_entry(entry, params))
         
         # Single value (literal)
-        parsed = self._parse(word)
-        if parsed is not None:
-            return parsed
+        kind = self.word_kinds[word_index]
+        if kind == WORD_LITERAL:
+            return self._constant(self.word_values[word_index])
+        if kind == WORD_JSON:
+            # Mutable literals are decoded afresh on every evaluation
+            return lambda: json.loads(word)
         
         # Parentheses blocks
         if word == "(":
-            result = None
-            current_idx = word_index + 1
-            while current_idx < len(self.words) and self.words[current_idx] != ")":
-                exec_result = self.word_exec(current_idx)
-                if exec_result is not None:
-                    result = exec_result
-                current_idx += self._phrase_length(current_idx)
-            return result
+            nodes = self._compile_block(word_index, ")")
+            if len(nodes) == 1:
+                return nodes[0]
+            if all(node in self._constants for node in nodes):
+                # A block of constants evaluates to its last non-null value
+                values = [self._constants[node] for node in nodes if self._constants[node] is not None]
+                return self._constant(values[-1] if values else None)
+            
+            def sequence():
+                result = None
+                for node in nodes:
+                    exec_result = node()
+                    if exec_result is not None:
+                        result = exec_result
+                return result
+            return sequence
         
         # Array blocks
         if word == "[":
-            result = []
-            current_idx = word_index + 1
-            while current_idx < len(self.words) and self.words[current_idx] != "]":
-                element = self.word_exec(current_idx)
-                result.append(element)
-                current_idx += self._phrase_length(current_idx)
-            return result
+            nodes = self._compile_block(word_index, "]")
+            return lambda: [node() for node in nodes]
         
         # Object blocks
         if word == "{":
-            result = {}
-            current_idx = word_index + 1
-            mode = "key"
-            key = None
+            nodes = self._compile_block(word_index, "}")
             
-            while current_idx < len(self.words) and self.words[current_idx] != "}":
-                element = self.word_exec(current_idx)
-                if mode == "key":
-                    key = element
-                    mode = "value"
-                else:
-                    result[key] = element
-                    mode = "key"
-                current_idx += self._phrase_length(current_idx)
-            return result
+            def mapping():
+                result = {}
+                key = None
+                for position, node in enumerate(nodes):
+                    if position % 2 == 0:
+                        key = node()
+                    else:
+                        result[key] = node()
+                return result
+            return mapping
         
-        # Function calls
+        # Function calls, resolved against the namespace when they run so
+        # that later definitions and redefinitions are picked up
         word_id = word.split("#")[0] if "#" in word else word
-        entry = self.namespace.get(word_id)
+        namespace = self.namespace
+        entry = compiled = _UNRESOLVED
         
-        if entry is None:
-            print(f"Undefined id: {word_id}")
+        def call():
+            nonlocal entry, compiled
+            current = namespace.get(word_id)
+            if current is not entry:
+                entry = current
+                compiled = self._counted(word_id, current, self._compile_call(word_index, word_id, current))
+            return compiled()
+        return self._profiled(word_id, word_index, call)
+    
+    def _tail_node(self, word_index: int, skip_operator: bool = False) -> Callable[[], Any]:
+        """Get the closure for a phrase in tail position of a function body"""
+        key = (word_index, skip_operator)
+        node = self._compiled_tails.get(key)
+        if node is None:
+            node = self._compile_tail(word_index, skip_operator)
+            if word_index < len(self.words):
+                self._compiled_tails[key] = node
+        return node
+    
+    def _compile_tail(self, word_index: int, skip_operator: bool = False) -> Callable[[], Any]:
+        """Compile a phrase in tail position
+        
+        Branches of if/when/unless, single-phrase blocks and user function
+        calls are tail positions; anything else compiles as usual.
+        """
+        if word_index >= len(self.words):
+            return self._node(word_index, skip_operator)
+        
+        # Infix and postfix operators, of which only when/unless have
+        # operands in tail position
+        if not skip_operator:
+            next_word_idx = word_index + self._phrase_length(word_index, True)
+            if next_word_idx < len(self.words):
+                entry = self.namespace.get(self.words[next_word_idx])
+                if entry and entry.get('operator') in ('postfix', 'infix'):
+                    compile_tail = entry.get('compile_tail')
+                    if entry['operator'] == 'infix' and compile_tail is not None:
+                        params = [word_index]
+                        params.extend(self._param_indices(next_word_idx + 1, entry['arity']))
+                        return self._instrumented(self.words[next_word_idx], word_index, entry,
+                                                  compile_tail(params))
+                    return self._node(word_index, skip_operator)
+        
+        word = self.words[word_index]
+        if word == "(":
+            phrases = self._block_phrases(word_index, ")")
+            if len(phrases) == 1:
+                return self._tail_node(phrases[0])
+            return self._node(word_index, skip_operator)
+        
+        if self.word_kinds[word_index] != WORD_IDENTIFIER:
+            return self._node(word_index, skip_operator)
+        
+        # Calls, resolved when they run like other call sites
+        namespace = self.namespace
+        entry = compiled = _UNRESOLVED
+        
+        def tail_call():
+            nonlocal entry, compiled
+            current = namespace.get(word)
+            if current is not entry:
+                entry = current
+                compiled = self._counted(word, current, self._compile_tail_call(word_index, word, current))
+            return compiled()
+        return self._profiled(word, word_index, tail_call)
+    
+    def _compile_tail_call(self, word_index: int, word_id: str, entry: Any) -> Callable[[], Any]:
+        """Compile a call in tail position of the namespace entry found for a word"""
+        if isinstance(entry, dict) and 'operator' not in entry:
+            if 'tail_body' in entry:
+                arg_nodes = [self._node(p) for p in self._param_indices(word_index + 1, entry['arity'])]
+                if self.lazy_args and 'memo' not in entry:
+                    thunks = self._compile_thunks(arg_nodes)
+                    return lambda: _TailCall(entry, thunks())
+                return lambda: _TailCall(entry, [node() for node in arg_nodes])
+            
+            compile_tail = entry.get('compile_tail')
+            if compile_tail is not None:
+                return compile_tail(self._param_indices(word_index + 1, entry['arity']))
+        
+        return self._compile_call(word_index, word_id, entry)
+    
+    def _profiled(self, word: str, word_index: int, node: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap the closure of a call for the profiler, if there is one
+        
+        Folded constants are left alone, as they make no call at run time.
+        """
+        if self.profiler is None or node in self._constants:
+            return node
+        return self.profiler.wrap(word, word_index, node)
+    
+    def _counted(self, word: str, entry: Any, node: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap the closure of a call of a namespace entry to count it, with metrics
+        
+        Calls are counted as function.<word> for user functions and as
+        builtin.<word> for other callable entries. Folded constants make no
+        call, and undefined words call nothing, so neither is counted.
+        """
+        if self.metrics is None or node in self._constants:
+            return node
+        if not isinstance(entry, dict) or 'func' not in entry:
+            return node
+        kind = 'function' if 'invoke' in entry else 'builtin'
+        return self.metrics.counter(f"{kind}.{word}", node)
+    
+    def _instrumented(self, word: str, word_index: int, entry: Any,
+                      node: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap the closure of a call for metrics and the profiler"""
+        return self._profiled(word, word_index, self._counted(word, entry, node))
+    
+    def _constant(self, value: Any) -> Callable[[], Any]:
+        """Compile a closure that returns value, recorded for folding"""
+        node = lambda: value
+        self._constants[node] = value
+        return node
+    
+    def _fold(self, operation: Callable, nodes: List[Callable[[], Any]],
+              foldable: Optional[Callable[..., bool]] = None) -> Optional[Callable[[], Any]]:
+        """Fold an operation over constant operand closures into a constant
+        
+        Returns None when an operand is not constant or the operation
+        cannot be folded.
+        """
+        constants = self._constants
+        if not all(node in constants for node in nodes):
             return None
+        value = fold_constant(operation, [constants[node] for node in nodes], foldable)
+        if value is _NOT_CONSTANT:
+            return None
+        return self._constant(value)
+    
+    def _compile_block(self, word_index: int, closer: str) -> List[Callable[[], Any]]:
+        """Compile the phrases inside a block up to its closing word"""
+        nodes = []
+        current_idx = word_index + 1
+        while current_idx < len(self.words) and self.words[current_idx] != closer:
+            nodes.append(self._node(current_idx))
+            current_idx += self._phrase_length(current_idx)
+        return nodes
+    
+    def _block_phrases(self, word_index: int, closer: str) -> List[int]:
+        """Get the start indices of the phrases inside a block"""
+        phrases = []
+        current_idx = word_index + 1
+        while current_idx < len(self.words) and self.words[current_idx] != closer:
+            phrases.append(current_idx)
+            current_idx += self._phrase_length(current_idx)
+        return phrases
+    
+    def _compile_call(self, word_index: int, word_id: str, entry: Any) -> Callable[[], Any]:
+        """Compile a call of the namespace entry found for a word"""
+        if entry is None:
+            def undefined():
+                self._write(f"Undefined id: {word_id}")
+                return None
+            return undefined
         
         if isinstance(entry, dict) and 'func' in entry:
-            arity = entry['arity']
-            func = entry['func']
-            params = []
-            current_idx = word_index + 1
-            
-            for _ in range(arity):
-                params.append(current_idx)
-                current_idx += self._phrase_length(current_idx)
-            
-            return func(params)
+            params = self._param_indices(word_index + 1, entry['arity'])
+            if 'operator' in entry:
+                # An operator used in prefix position gets no left operand
+                func = entry['func']
+                return lambda: func(params)
+            return self._compile_entry(entry, params)
         
-        print(f"Not handled, word: {word}")
-        return None
+        word = self.words[word_index]
+        
+        def not_handled():
+            self._write(f"Not handled, word: {word}")
+            return None
+        return not_handled
+    
+    def _compile_entry(self, entry: Dict[str, Any], params: List[int]) -> Callable[[], Any]:
+        """Compile a call of a namespace entry with the given parameter indices"""
+        compile_func = entry.get('compile')
+        if compile_func is not None:
+            return compile_func(params)
+        
+        invoke = entry.get('invoke')
+        if invoke is not None:
+            arg_nodes = [self._node(p) for p in params]
+            if self.lazy_args and 'tail_body' in entry and 'memo' not in entry:
+                thunks = self._compile_thunks(arg_nodes)
+                return lambda: invoke(thunks())
+            # User functions take their evaluated arguments directly
+            return lambda: invoke([node() for node in arg_nodes])
+        
+        func = entry['func']
+        return lambda: func(params)
+    
+    def _compile_thunks(self, arg_nodes: List[Callable[[], Any]]) -> Callable[[], List[Any]]:
+        """Compile the arguments of a user function call into thunks
+        
+        Literal arguments are passed as values, as there is nothing to defer.
+        """
+        constants = self._constants
+        frames = self.namespace['stack']
+        times_stack = self.namespace['times_stack']
+        each_stack = self.namespace['each_stack']
+        arg_specs = [(node in constants, constants.get(node), node) for node in arg_nodes]
+        
+        def thunks():
+            context = (len(frames), len(times_stack), len(each_stack),
+                       frames[-1].args if frames else None)
+            return [value if constant else _Thunk(node, *context)
+                    for constant, value, node in arg_specs]
+        return thunks
+    
+    def _force(self, thunk: _Thunk) -> Any:
+        """Evaluate a thunk with the stacks cut back to its caller's depths"""
+        namespace = self.namespace
+        cut = [(namespace['stack'], thunk.frames),
+               (namespace['times_stack'], thunk.times),
+               (namespace['each_stack'], thunk.each)]
+        saved = []
+        for items, depth in cut:
+            saved.append(items[depth:])
+            del items[depth:]
+        frame = namespace['stack'][-1] if thunk.frames else None
+        if frame is not None:
+            frame_args, frame.args = frame.args, thunk.args
+        try:
+            return thunk.node()
+        finally:
+            if frame is not None:
+                frame.args = frame_args
+            for (items, _), tail in zip(cut, saved):
+                items.extend(tail)
+    
+    def _param_indices(self, word_index: int, arity: int) -> List[int]:
+        """Get the start indices of arity consecutive phrases"""
+        params = []
+        current_idx = word_index
+        for _ in range(arity):
+            params.append(current_idx)
+            current_idx += self._phrase_length(current_idx)
+        return params
     
     def _phrase_length(self, word_index: int, skip_operator: bool = False) -> int:
         """Calculate the length of a phrase starting at word_index"""
-        if not skip_operator and word_index < len(self.phrase_lengths) and self.phrase_lengths[word_index] > 0:
-            return self.phrase_lengths[word_index]
+        if word_index < len(self.phrase_lengths):
+            cached = (self.operand_lengths if skip_operator else self.phrase_lengths)[word_index]
+            if cached > 0:
+                if self.metrics is not None:
+                    self.metrics.count('phrase_length.hits')
+                return cached
+        if self.metrics is not None:
+            self.metrics.count('phrase_length.misses')
         
         if word_index >= len(self.words):
-            print(f"Error: wrong word_index in phrase_length: {word_index}")
+            self._write(f"Error: wrong word_index in phrase_length: {word_index}")
             return 0
         
         word = self.words[word_index]
+        kind = self.word_kinds[word_index]
         length = 1
         
         def next_index() -> int:
             return word_index + length
         
         def word_arity(w: str) -> Optional[int]:
-            if "#" in w:
+            if kind == WORD_DEFINITION:
                 return 0
             
             entry = self.namespace.get(w) or self.namespace.get('arities', {}).get(w)
             if entry is None:
-                print(f"Word not in namespace: {w}")
+                self._write(f"Word not in namespace: {w}")
                 return None
             return entry.get('arity', 0)
         
         # Single value
-        if self._parse(word) is not None:
+        if kind == WORD_LITERAL or kind == WORD_JSON:
             pass  # length remains 1
         
         # Blocks
-        elif word in ["{", "[", "("]:
+        elif kind == WORD_OPEN:
             matching_parens = {"{": "}", "[": "]", "(": ")"}
             while True:
                 if next_index() >= len(self.words):
@@ -338,6 +1055,7 @@ class PangeaInterpreter:
                 if self.words[next_index()] == matching_parens[word]:
                     if next_index() < len(self.phrase_lengths):
                         self.phrase_lengths[next_index()] = 1
+                        self.operand_lengths[next_index()] = 1
                     length += 1
                     break
                 else:
@@ -350,6 +1068,9 @@ class PangeaInterpreter:
                 for _ in range(arity):
                     length += self._phrase_length(next_index())
         
+        if word_index < len(self.operand_lengths):
+            self.operand_lengths[word_index] = length
+        
         # Handle postfix/infix operators
         if not skip_operator:
             next_word_idx = next_index()
@@ -369,6 +1090,8 @@ class PangeaInterpreter:
         try:
             return json.loads(text)
         except:
+            if self.metrics is not None:
+                self.metrics.count('json_failures')
             return None
     
     def _is_number(self, text: str) -> bool:
@@ -383,7 +1106,7 @@ class PangeaInterpreter:
     def _print(self, params: List[int]) -> Any:
         """Print function"""
         output = self.word_exec(params[0])
-        print(output)
+        self._write(output)
         return output
     
     def _when(self, params: List[int]) -> Any:
@@ -394,57 +1117,237 @@ class PangeaInterpreter:
     def _times(self, params: List[int]) -> Any:
         """Times function"""
         count = self.word_exec(params[0], True)
+        return self._repeat(count, lambda: self.word_exec(params[1]))
+    
+    def _repeat(self, count: Any, body: Callable[[], Any]) -> Any:
+        """Run body count times under a new times counter, returning its last result"""
         result = None
-        
-        self.namespace['times_stack'].append(1)
-        
-        for i in range(int(count)):
-            result = self.word_exec(params[1])
-            self.namespace['times_stack'][-1] += 1
-        
-        self.namespace['times_stack'].pop()
+        times_stack = self.namespace['times_stack']
+        counter = TimesCounter()
+        times_stack.append(counter)
+        budget = self.budget
+        if budget is None:
+            for i in range(1, int(count) + 1):
+                counter.count = i
+                result = body()
+        else:
+            step = budget.step
+            for i in range(1, int(count) + 1):
+                step()
+                counter.count = i
+                result = body()
+        times_stack.pop()
         return result
     
+    def _nothing_entry(self, word_index: int) -> Optional[Dict[str, Any]]:
+        """The entry of a do-nothing built-in (pass, dont) called at word_index
+        
+        Returns None when the phrase is anything else.
+        """
+        if word_index >= len(self.words) or self.word_kinds[word_index] != WORD_IDENTIFIER:
+            return None
+        if self._phrase_length(word_index) != self._phrase_length(word_index, True):
+            return None  # Followed by an operator
+        entry = self.namespace.get(self.words[word_index])
+        if isinstance(entry, dict) and entry.get('compile') == self._compile_nothing:
+            return entry
+        return None
+    
     def _times_count(self, params: List[int]) -> int:
         """Get current times counter"""
         depth = self.word_exec(params[0])
         stack = self.namespace['times_stack']
-        return stack[-depth] if stack else 0
+        return stack[-depth].count if stack else 0
     
-    def _def(self, params: List[int]) -> None:
+    def _def(self, params: List[int], pure: bool = False) -> None:
         """Define a function"""
         word_parts = self.words[params[0]].split("#")
         func_id = word_parts[0]
         arity = int(word_parts[1])
         word_index = params[1]
+        stack = self.namespace['stack']
         
-        def user_func(func_params):
-            # Evaluate parameters
-            args = [self.word_exec(p) for p in func_params]
-            
+        def tail_body():
+            # Execute function body, returning a _TailCall for a call in
+            # tail position
+            return self._tail_node(word_index)()
+        
+        def invoke(args):
             # Push args to stack
-            self.namespace['stack'].append({'args': args})
+            frame = CallFrame(args)
+            stack.append(frame)
+            budget = self.budget
             
-            # Execute function body
-            result = self.word_exec(word_index)
+            # Execute function body, running tail calls in the same frame
+            try:
+                if budget is not None:
+                    budget.call(len(stack) - 1)
+                result = tail_body()
+                while type(result) is _TailCall:
+                    if budget is not None:
+                        budget.step()
+                    frame.args = result.args
+                    result = result.entry['tail_body']()
+                return result
+            finally:
+                stack.pop()
+        
+        def user_func(func_params):
+            # Evaluate parameters
+            return invoke([self.word_exec(p) for p in func_params])
+        
+        entry = {
+            'arity': arity,
+            'func': user_func,
+            'invoke': invoke,
+            'tail_body': tail_body
+        }
+        self._define(func_id, entry, word_index, pure)
+    
+    def _def_pure(self, params: List[int]) -> None:
+        """Define a function whose results are cached by argument"""
+        self._def(params, pure=True)
+    
+    def _define(self, func_id: str, entry: Dict[str, Any], body_index: int, pure: bool = False):
+        """Bind a user function, memoizing it if it is declared or found pure"""
+        previous = self.namespace.get(func_id)
+        self._auto_memoized.pop(func_id, None)
+        if previous is not None:
+            # Cached results may depend on the old definition
+            for cache in self._memo_caches:
+                cache.clear()
+        
+        if pure:
+            entry = self._memoized(entry)
+        elif self.auto_memoize and self._is_pure(func_id, body_index):
+            self._auto_memoized[func_id] = (body_index, entry)
+            entry = self._memoized(entry)
+        self.namespace[func_id] = entry
+        
+        if previous is not None:
+            self._recheck_purity()
+    
+    def _recheck_purity(self):
+        """Unmemoize auto-memoized functions that a redefinition made impure
+        
+        Dropping one memo can make its callers impure in turn, so this
+        repeats until every remaining one still passes _is_pure.
+        """
+        changed = True
+        while changed:
+            changed = False
+            for func_id, (body_index, plain_entry) in list(self._auto_memoized.items()):
+                if not self._is_pure(func_id, body_index):
+                    del self._auto_memoized[func_id]
+                    self.namespace[func_id] = plain_entry
+                    changed = True
+    
+    def _is_pure(self, func_id: str, body_index: int) -> bool:
+        """Whether a function body only reads its arguments and calls pure words
+        
+        Output, definitions, loop counters and iteration items make a body
+        impure, as do words that are not defined yet.
+        """
+        end_index = body_index + self._phrase_length(body_index)
+        for word_index in range(body_index, min(end_index, len(self.words))):
+            if self.word_kinds[word_index] != WORD_IDENTIFIER:
+                if self.word_kinds[word_index] == WORD_DEFINITION:
+                    return False
+                continue
             
-            # Pop stack
-            self.namespace['stack'].pop()
+            word = self.words[word_index]
+            if word == func_id:
+                continue  # Recursion
+            entry = self.namespace.get(word)
+            if not isinstance(entry, dict):
+                return False
+            if entry.get('pure'):
+                continue
+            if 'invoke' not in entry and (word in PURE_BUILTINS or 'operation' in entry):
+                continue
+            return False
+        return True
+    
+    def _memoized(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Wrap a user function entry with an argument-keyed LRU cache
+        
+        Arguments are keyed by type and value, so 1, 1.0 and true are
+        cached separately. Calls with unhashable arguments (arrays and
+        objects) are not cached.
+        """
+        invoke = entry['invoke']
+        cache: OrderedDict = OrderedDict()
+        self._memo_caches.append(cache)
+        memo_size = self.memo_size
+        
+        def memo_invoke(args):
+            key = tuple((type(arg), arg) for arg in args)
+            try:
+                result = cache.get(key, _UNRESOLVED)
+            except TypeError:
+                return invoke(args)
+            if result is not _UNRESOLVED:
+                cache.move_to_end(key)
+                return result
             
+            result = invoke(args)
+            cache[key] = result
+            if len(cache) > memo_size:
+                cache.popitem(last=False)
             return result
         
-        self.namespace[func_id] = {
-            'arity': arity,
-            'func': user_func
+        def memo_func(func_params):
+            return memo_invoke([self.word_exec(p) for p in func_params])
+        
+        memo_entry = {
+            'arity': entry['arity'],
+            'func': memo_func,
+            'invoke': memo_invoke,
+            'pure': True,
+            'memo': cache
         }
+        
+        tail_body = entry.get('tail_body')
+        if tail_body is not None:
+            stack = self.namespace['stack']
+            
+            def memo_tail_body():
+                # Tail calls reuse the caller's frame, so a hit ends the
+                # trampoline and a miss runs the body in place; only results
+                # that are not themselves tail calls can be cached here
+                args = stack[-1].args
+                key = tuple((type(arg), arg) for arg in args)
+                try:
+                    result = cache.get(key, _UNRESOLVED)
+                except TypeError:
+                    return tail_body()
+                if result is not _UNRESOLVED:
+                    cache.move_to_end(key)
+                    return result
+                
+                result = tail_body()
+                if type(result) is not _TailCall:
+                    cache[key] = result
+                    if len(cache) > memo_size:
+                        cache.popitem(last=False)
+                return result
+            
+            memo_entry['tail_body'] = memo_tail_body
+        
+        return memo_entry
     
     def _arg(self, params: List[int]) -> Any:
         """Get function argument"""
         index = self.word_exec(params[0])
         stack = self.namespace['stack']
         if stack:
-            args = stack[-1].get('args', [])
-            return args[index - 1] if 0 < index <= len(args) else None
+            args = stack[-1].args
+            if not 0 < index <= len(args):
+                return None
+            value = args[index - 1]
+            if type(value) is _Thunk:
+                value = args[index - 1] = self._force(value)
+            return value
         return None
     
     def _if3(self, params: List[int]) -> Any:
@@ -483,6 +1386,133 @@ class PangeaInterpreter:
         exp = self.word_exec(params[1])
         return base ** exp
     
+    # Compiled forms of the built-ins, used by _compile
+    def _compile_print(self, params: List[int]) -> Callable[[], Any]:
+        value = self._node(params[0])
+        write = self.output.write
+        
+        def print_node():
+            output = value()
+            write(f"{output}\n")
+            return output
+        return print_node
+    
+    def _compile_when(self, params: List[int]) -> Callable[[], Any]:
+        what = self._node(params[0], True)
+        condition = self._node(params[1])
+        otherwise = self._node(params[2])
+        return lambda: what() if condition() else otherwise()
+    
+    def _compile_times(self, params: List[int]) -> Callable[[], Any]:
+        count = self._node(params[0], True)
+        body = self._node(params[1])
+        repeat = self._repeat
+        
+        # Empty blocks, literals and pass/dont have nothing to run per iteration
+        if body in self._constants:
+            value = self._constants[body]
+            return lambda: value if int(count()) > 0 else None
+        
+        nothing = self._nothing_entry(params[1])
+        if nothing is not None:
+            word = self.words[params[1]]
+            namespace = self.namespace
+            
+            def times_nothing():
+                n = count()
+                if namespace.get(word) is not nothing:
+                    return repeat(n, body)  # Redefined since compiled
+                int(n)
+                return None
+            return times_nothing
+        
+        return lambda: repeat(count(), body)
+    
+    def _compile_times_count(self, params: List[int]) -> Callable[[], Any]:
+        depth = self._node(params[0])
+        times_stack = self.namespace['times_stack']
+        
+        if depth in self._constants:
+            d = self._constants[depth]
+            return lambda: times_stack[-d].count if times_stack else 0
+        
+        def times_count():
+            # The depth is evaluated even outside a loop, for its side effects
+            d = depth()
+            return times_stack[-d].count if times_stack else 0
+        return times_count
+    
+    def _compile_arg(self, params: List[int]) -> Callable[[], Any]:
+        index = self._node(params[0])
+        stack = self.namespace['stack']
+        
+        def arg_node():
+            i = index()
+            if stack:
+                args = stack[-1].args
+                if not 0 < i <= len(args):
+                    return None
+                value = args[i - 1]
+                if type(value) is _Thunk:
+                    value = args[i - 1] = self._force(value)
+                return value
+            return None
+        return arg_node
+    
+    def _compile_if3(self, params: List[int]) -> Callable[[], Any]:
+        condition = self._node(params[0])
+        then = self._node(params[1])
+        otherwise = self._node(params[2])
+        return lambda: then() if condition() else otherwise()
+    
+    def _compile_when_tail(self, params: List[int]) -> Callable[[], Any]:
+        what = self._tail_node(params[0], True)
+        condition = self._node(params[1])
+        otherwise = self._tail_node(params[2])
+        return lambda: what() if condition() else otherwise()
+    
+    def _compile_if3_tail(self, params: List[int]) -> Callable[[], Any]:
+        condition = self._node(params[0])
+        then = self._tail_node(params[1])
+        otherwise = self._tail_node(params[2])
+        return lambda: then() if condition() else otherwise()
+    
+    def _compile_unless_tail(self, params: List[int]) -> Callable[[], Any]:
+        what = self._tail_node(params[0], True)
+        condition = self._node(params[1])
+        return lambda: None if condition() else what()
+    
+    def _compile_unless(self, params: List[int]) -> Callable[[], Any]:
+        what = self._node(params[0], True)
+        condition = self._node(params[1])
+        return lambda: None if condition() else what()
+    
+    def _compile_nothing(self, params: List[int]) -> Callable[[], Any]:
+        return self._constant(None)
+    
+    def _compile_greater(self, params: List[int]) -> Callable[[], Any]:
+        left = self._node(params[0], True)
+        right = self._node(params[1])
+        folded = self._fold(lambda a, b: a > b, [left, right])
+        if folded is not None:
+            return folded
+        return lambda: left() > right()
+    
+    def _compile_squared(self, params: List[int]) -> Callable[[], Any]:
+        n = self._node(params[0], True)
+        folded = self._fold(lambda v: v ** 2, [n])
+        if folded is not None:
+            return folded
+        return lambda: n() ** 2
+    
+    def _compile_exponent(self, params: List[int]) -> Callable[[], Any]:
+        base = self._node(params[0], True)
+        exp = self._node(params[1])
+        folded = self._fold(lambda b, e: b ** e, [base, exp], small_exponent)
+        if folded is not None:
+            return folded
+        return lambda: base() ** exp()
+    
     def _each(self, params: List[int]) -> Any:
         """Each iterator function"""
         iterable = self.word_exec(params[0], True)
@@ -497,9 +1527,12 @@ class PangeaInterpreter:
         else:
             items = []
         
+        budget = self.budget
         for key, item in items:
             if self.namespace['each_stack'][-1]['stop']:
                 break
+            if budget is not None:
+                budget.step()
             
             self.namespace['each_stack'][-1]['iter'] = {'v': item, 'k': key}
             result = self.word_exec(params[1])
@@ -0,0 +1,713 @@
+#!/usr/bin/env python3
+"""
+Pangea Bytecode VM
+A second execution engine for the Pangea Python Interpreter
+
+The parsed program (words plus phrase lengths) is lowered into flat,
+stack-based bytecode and run by a single dispatch loop. User function
+calls push a return address instead of recursing in Python, so deeply
+recursive Pangea programs are limited by memory, not by the Python
+recursion limit.
+
+Built-ins without a dedicated lowering (each_item, each_key, ...) are
+called through their tree-walker implementation, which shares the
+namespace, call frames and loop stacks with the VM.
+"""
+
+import asyncio
+import inspect
+from typing import List, Dict, Any, Optional, Callable, Generator, Iterable, Union
+
+from pangea_python_interpreter import (PangeaInterpreter, CallFrame, TimesCounter, WORD_LITERAL, WORD_JSON,
+                                      fold_constant, small_exponent, _NOT_CONSTANT)
+
+
+# Opcodes
+PUSH_CONST = 0      # push arg
+PUSH_JSON = 1       # push a freshly decoded mutable literal (arg: word)
+POP = 2             # discard top
+KEEP = 3            # pop value; replace top with it unless it is None
+BUILD_LIST = 4      # pop arg values into a list
+BUILD_MAP = 5       # pop arg values as key/value pairs into a dict
+BINARY = 6          # pop right, left; push arg(left, right)
+UNARY = 7           # replace top with arg(top)
+PRINT = 8           # print top, leaving it on the stack
+JUMP = 9            # jump to arg
+JUMP_IF_FALSE = 10  # pop condition; jump to arg when falsy
+ARG = 11            # push argument arg (1-based) of the current frame
+ARG_DYNAMIC = 12    # pop index; push that argument of the current frame
+TIMES_SETUP = 13    # pop count; open a times loop; push None as result
+LOOP_TIMES = 14     # leave loop and jump to arg when done, else pop result
+TIMES_STEP = 15     # advance the times counter and jump back to arg
+TIMES_COUNT = 16    # pop depth; push that times counter
+EACH_SETUP = 17     # pop iterable; open an each loop; push None as result
+LOOP_EACH = 18      # leave loop and jump to arg when done, else pop result
+CALL_PREPARE = 19   # resolve a call (arg: CallSite); push entry or handle it
+CALL = 20           # pop arg values and entry; enter the function's code
+RETURN = 21         # leave the current function
+HALT = 22           # stop, returning top
+CALL_BUILTIN = 23   # push arg[0](arg[1]) through the tree-walker built-in
+DEF = 24            # bind a user function (arg: name, arity, code, body index, pure); push None
+ERROR = 25          # print message arg; push None
+GUARD = 26          # continue if arg (CallSite) still names its built-in,
+                    # else handle the call through the new entry
+TIMES_COUNT_AT = 27 # push the times counter arg loops up
+
+OPCODE_NAMES = {
+    value: name for name, value in globals().items()
+    if name.isupper() and isinstance(value, int)
+}
+
+
+class CodeObject:
+    """Bytecode for a function body or a sequence of top-level statements"""
+
+    __slots__ = ('name', 'instructions')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.instructions: List[tuple] = []
+
+    def emit(self, op: int, arg: Any = None) -> int:
+        """Append an instruction and return its address"""
+        self.instructions.append((op, arg))
+        return len(self.instructions) - 1
+
+    def patch(self, address: int, target: int):
+        """Point the jump at address to target"""
+        op, _ = self.instructions[address]
+        self.instructions[address] = (op, target)
+
+    def here(self) -> int:
+        return len(self.instructions)
+
+    def disassemble(self) -> str:
+        lines = [f"code {self.name}:"]
+        for address, (op, arg) in enumerate(self.instructions):
+            if isinstance(arg, CodeObject):
+                arg = arg.name
+            lines.append(f"  {address:4d} {OPCODE_NAMES[op]:<14} {'' if arg is None else arg}")
+        return "\n".join(lines)
+
+
+class CallSite:
+    """Static information for a call whose target is resolved at run time"""
+
+    __slots__ = ('word_id', 'word_index', 'argc', 'end', 'entry')
+
+    def __init__(self, word_id: str, word_index: int, argc: int, entry: Any = None):
+        self.word_id = word_id
+        self.word_index = word_index
+        self.argc = argc
+        self.end = 0
+        self.entry = entry
+
+    def __repr__(self):
+        return f"{self.word_id}/{self.argc} -> {self.end}"
+
+
+class PangeaVM(PangeaInterpreter):
+    """Pangea interpreter that executes lowered bytecode"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        lowerings = {
+            'print': self._lower_print,
+            'when': self._lower_when,
+            'times': self._lower_times,
+            'def': self._lower_def,
+            'def_pure': self._lower_def_pure,
+            'arg': self._lower_arg,
+            'if': self._lower_if3,
+            'unless': self._lower_unless,
+            'dont': self._lower_nothing,
+            'pass': self._lower_nothing,
+            'times_count': self._lower_times_count,
+            'greater': self._binary_lowering(lambda a, b: a > b),
+            'squared': self._lower_squared,
+            'exponent': self._binary_lowering(lambda a, b: a ** b, small_exponent),
+            'each': self._lower_each,
+        }
+        for name, lower in lowerings.items():
+            self.namespace[name]['lower'] = lower
+
+        for entry in self.namespace.values():
+            if isinstance(entry, dict) and 'operation' in entry:
+                entry['lower'] = self._binary_lowering(entry['operation'])
+
+    def _execute(self, start_index: int) -> Any:
+        """Lower the top-level statements starting at start_index and run them"""
+        return self._run(self._lower_statements(start_index))
+
+    async def exec_async(self, code: Union[str, Iterable[str]], pause_every: int = 1000,
+                         timeout: Optional[float] = None) -> Any:
+        """Execute Pangea code as a coroutine that lets the event loop run
+
+        The dispatch loop pauses every pause_every loop iterations and
+        function calls. At each pause it flushes pending output, awaiting
+        the flush of an AsyncOutputBuffer, and yields to the event loop.
+        Cancelling the task stops the program at a pause. After timeout
+        seconds, asyncio.TimeoutError is raised. Built-ins run through the
+        tree walker, and functions they call, do not pause; neither do
+        def_pure (or auto-memoized) functions, which run in a nested
+        dispatch loop.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            if self.trace:
+                self._write(f"Executing: {code if isinstance(code, str) else '<stream>'}")
+
+            start_index = self._ingest(self.parse_code(code))
+            self._trace_begin(start_index)
+            self._start_budget()
+
+            steps = self._steps(self._lower_statements(start_index), None, pause_every)
+            try:
+                while True:
+                    try:
+                        next(steps)
+                    except StopIteration as done:
+                        result = done.value
+                        break
+                    await self._flush_async()
+                    if deadline is not None and loop.time() >= deadline:
+                        raise asyncio.TimeoutError(f"Pangea code ran past its {timeout} s timeout")
+                    await asyncio.sleep(0)
+            finally:
+                # Unwinds the frames and loops of an unfinished run
+                steps.close()
+
+            if self.trace:
+                self._write("[end]")
+            return result
+        finally:
+            await self._flush_async()
+            if self.metrics is not None:
+                self.metrics.execution_finished()
+
+    async def _flush_async(self):
+        flushed = self.output.flush()
+        if inspect.isawaitable(flushed):
+            await flushed
+
+    def _lower_statements(self, start_index: int) -> CodeObject:
+        """Lower the top-level statements starting at start_index"""
+        code = CodeObject("<exec>")
+        current_idx = start_index
+        statements = 0
+
+        while current_idx < len(self.words):
+            if self.words[current_idx] == ")":
+                break
+            if statements:
+                code.emit(POP)
+            self._lower(code, current_idx)
+            statements += 1
+            current_idx += self._phrase_length(current_idx)
+
+        if not statements:
+            code.emit(PUSH_CONST, None)
+        code.emit(HALT)
+        return code
+
+    # Lowering
+    def _lower(self, code: CodeObject, word_index: int, skip_operator: bool = False):
+        """Emit instructions that push the value of the phrase at word_index"""
+        if word_index >= len(self.words):
+            code.emit(ERROR, f"Error: wrong word_index: {word_index}")
+            return
+
+        word = self.words[word_index]
+
+        # Handle postfix and infix operators
+        if not skip_operator:
+            next_word_idx = word_index + self._phrase_length(word_index, True)
+            if next_word_idx < len(self.words):
+                entry = self.namespace.get(self.words[next_word_idx])
+
+                if entry and entry.get('operator') == 'postfix':
+                    self._lower_entry(code, entry, [word_index])
+                    return
+
+                if entry and entry.get('operator') == 'infix':
+                    params = [word_index]  # First operand
+                    params.extend(self._param_indices(next_word_idx + 1, entry['arity']))
+                    self._lower_entry(code, entry, params)
+                    return
+
+        # Single value (literal)
+        kind = self.word_kinds[word_index]
+        if kind == WORD_LITERAL:
+            code.emit(PUSH_CONST, self.word_values[word_index])
+            return
+        if kind == WORD_JSON:
+            code.emit(PUSH_JSON, word)
+            return
+
+        # Parentheses blocks
+        if word == "(":
+            phrases = self._block_phrases(word_index, ")")
+            if len(phrases) == 1:
+                self._lower(code, phrases[0])
+                return
+            code.emit(PUSH_CONST, None)
+            for phrase in phrases:
+                self._lower(code, phrase)
+                code.emit(KEEP)
+            return
+
+        # Array blocks
+        if word == "[":
+            phrases = self._block_phrases(word_index, "]")
+            for phrase in phrases:
+                self._lower(code, phrase)
+            code.emit(BUILD_LIST, len(phrases))
+            return
+
+        # Object blocks
+        if word == "{":
+            phrases = self._block_phrases(word_index, "}")
+            for phrase in phrases:
+                self._lower(code, phrase)
+            code.emit(BUILD_MAP, len(phrases))
+            return
+
+        # Function calls
+        word_id = word.split("#")[0] if "#" in word else word
+        entry = self.namespace.get(word_id)
+        if isinstance(entry, dict) and 'lower' in entry:
+            # Built-ins can be redefined by the program while it runs
+            site = CallSite(word_id, word_index, entry['arity'], entry)
+            code.emit(GUARD, site)
+            params = self._param_indices(word_index + 1, entry['arity'])
+            if 'operator' in entry:
+                # An operator used in prefix position gets no left operand
+                code.emit(CALL_BUILTIN, (entry['func'], params))
+            else:
+                self._lower_entry(code, entry, params)
+            site.end = code.here()
+            return
+
+        # User functions are resolved when the call runs
+        if isinstance(entry, dict) and 'func' in entry:
+            argc = entry['arity']
+        else:
+            known = self.namespace['arities'].get(word_id)
+            argc = known['arity'] if known else 0
+
+        site = CallSite(word_id, word_index, argc)
+        code.emit(CALL_PREPARE, site)
+        for param in self._param_indices(word_index + 1, argc):
+            self._lower(code, param)
+        code.emit(CALL, argc)
+        site.end = code.here()
+
+    def _lower_entry(self, code: CodeObject, entry: Dict[str, Any], params: List[int]):
+        """Emit a call of a built-in entry with the given parameter indices"""
+        lower = entry.get('lower')
+        if lower is not None:
+            lower(code, params)
+        else:
+            code.emit(CALL_BUILTIN, (entry['func'], params))
+
+    def _lower_print(self, code: CodeObject, params: List[int]):
+        self._lower(code, params[0])
+        code.emit(PRINT)
+
+    def _lower_when(self, code: CodeObject, params: List[int]):
+        self._lower(code, params[1])
+        otherwise = code.emit(JUMP_IF_FALSE)
+        self._lower(code, params[0], True)
+        end = code.emit(JUMP)
+        code.patch(otherwise, code.here())
+        self._lower(code, params[2])
+        code.patch(end, code.here())
+
+    def _lower_if3(self, code: CodeObject, params: List[int]):
+        self._lower(code, params[0])
+        otherwise = code.emit(JUMP_IF_FALSE)
+        self._lower(code, params[1])
+        end = code.emit(JUMP)
+        code.patch(otherwise, code.here())
+        self._lower(code, params[2])
+        code.patch(end, code.here())
+
+    def _lower_unless(self, code: CodeObject, params: List[int]):
+        self._lower(code, params[1])
+        what = code.emit(JUMP_IF_FALSE)
+        code.emit(PUSH_CONST, None)
+        end = code.emit(JUMP)
+        code.patch(what, code.here())
+        self._lower(code, params[0], True)
+        code.patch(end, code.here())
+
+    def _lower_nothing(self, code: CodeObject, params: List[int]):
+        code.emit(PUSH_CONST, None)
+
+    def _lower_times(self, code: CodeObject, params: List[int]):
+        self._lower(code, params[0], True)
+        setup = code.emit(TIMES_SETUP)
+        top = code.emit(LOOP_TIMES)
+        body = code.here()
+        self._lower(code, params[1])
+        instructions = code.instructions
+
+        # Empty blocks, literals and pass/dont have nothing to run per
+        # iteration. The body is lowered once and rewritten, as probing it
+        # separately would lower nested loops 2^depth times.
+        if code.here() - body == 1 and instructions[body][0] == PUSH_CONST:
+            value = instructions[body][1]
+            del instructions[setup:]
+            code.emit(UNARY, lambda count: value if int(count) > 0 else None)
+            return
+
+        nothing = self._nothing_entry(params[1])
+        if nothing is not None:
+            del instructions[setup:]
+            word = self.words[params[1]]
+            body_index = params[1]
+            namespace = self.namespace
+
+            def times_nothing(count):
+                if namespace.get(word) is not nothing:
+                    # Redefined since lowered: run it through the tree walker
+                    return self._repeat(count, lambda: self.word_exec(body_index))
+                int(count)
+                return None
+            code.emit(UNARY, times_nothing)
+            return
+
+        code.emit(TIMES_STEP, top)
+        code.patch(top, code.here())
+
+    def _lower_each(self, code: CodeObject, params: List[int]):
+        self._lower(code, params[0], True)
+        code.emit(EACH_SETUP)
+        top = code.emit(LOOP_EACH)
+        self._lower(code, params[1])
+        code.emit(JUMP, top)
+        code.patch(top, code.here())
+
+    def _lower_times_count(self, code: CodeObject, params: List[int]):
+        depth = self.word_values[params[0]] if params[0] < len(self.words) else None
+        if type(depth) is int and self._phrase_length(params[0]) == 1:
+            code.emit(TIMES_COUNT_AT, depth)
+        else:
+            self._lower(code, params[0])
+            code.emit(TIMES_COUNT)
+
+    def _lower_arg(self, code: CodeObject, params: List[int]):
+        index = self.word_values[params[0]] if params[0] < len(self.words) else None
+        if type(index) is int and self._phrase_length(params[0]) == 1:
+            code.emit(ARG, index)
+        else:
+            self._lower(code, params[0])
+            code.emit(ARG_DYNAMIC)
+
+    def _lower_squared(self, code: CodeObject, params: List[int]):
+        operand = code.here()
+        self._lower(code, params[0], True)
+        operation = lambda n: n ** 2
+        if not self._fold_operands(code, [operand], operation):
+            code.emit(UNARY, operation)
+
+    def _binary_lowering(self, operation: Callable[[Any, Any], Any],
+                         foldable: Optional[Callable[..., bool]] = None):
+        def lower(code: CodeObject, params: List[int]):
+            left = code.here()
+            self._lower(code, params[0], True)
+            right = code.here()
+            self._lower(code, params[1])
+            if not self._fold_operands(code, [left, right], operation, foldable):
+                code.emit(BINARY, operation)
+        return lower
+
+    def _fold_operands(self, code: CodeObject, starts: List[int], operation: Callable,
+                       foldable: Optional[Callable[..., bool]] = None) -> bool:
+        """Replace operands just lowered as single constants by their result
+
+        starts holds the address of each operand's code. Returns False,
+        leaving the code untouched, when the operation cannot be folded.
+        """
+        instructions = code.instructions
+        ends = starts[1:] + [code.here()]
+        if any(end - start != 1 or instructions[start][0] != PUSH_CONST
+               for start, end in zip(starts, ends)):
+            return False
+        value = fold_constant(operation, [instructions[start][1] for start in starts], foldable)
+        if value is _NOT_CONSTANT:
+            return False
+        del instructions[starts[0]:]
+        code.emit(PUSH_CONST, value)
+        return True
+
+    def _lower_def(self, code: CodeObject, params: List[int], pure: bool = False):
+        word_parts = self.words[params[0]].split("#")
+        func_id = word_parts[0]
+        arity = int(word_parts[1])
+
+        body = CodeObject(self.words[params[0]])
+        self._lower(body, params[1])
+        body.emit(RETURN)
+
+        code.emit(DEF, (func_id, arity, body, params[1], pure))
+
+    def _lower_def_pure(self, code: CodeObject, params: List[int]):
+        self._lower_def(code, params, pure=True)
+
+    def _function_entry(self, arity: int, body: CodeObject) -> Dict[str, Any]:
+        """Namespace entry for a function lowered to bytecode"""
+        def invoke(args):
+            return self._run(body, args)
+
+        def user_func(func_params):
+            return invoke([self.word_exec(p) for p in func_params])
+
+        return {
+            'arity': arity,
+            'func': user_func,
+            'invoke': invoke,
+            'code': body
+        }
+
+    # Execution
+    def _run(self, code: CodeObject, args: Optional[List[Any]] = None) -> Any:
+        """Run bytecode until it halts or its outermost function returns"""
+        try:
+            next(self._steps(code, args))
+        except StopIteration as done:
+            return done.value
+
+    def _steps(self, code: CodeObject, args: Optional[List[Any]] = None,
+               pause_every: int = 0) -> Generator[None, None, Any]:
+        """Run bytecode, pausing every pause_every loop iterations and calls
+
+        The result is the generator's return value. With pause_every 0 it
+        never pauses. With metrics, instructions are counted per opcode and
+        added to the metrics when the run ends.
+        """
+        countdown = pause_every
+        budget = self.budget
+        metrics = self.metrics
+        op_counts = None if metrics is None else [0] * (max(OPCODE_NAMES) + 1)
+        namespace = self.namespace
+        frames = namespace['stack']
+        times_stack = namespace['times_stack']
+        each_stack = namespace['each_stack']
+        depths = (len(frames), len(times_stack), len(each_stack))
+
+        write = self.output.write
+        stack: List[Any] = []
+        calls: List[tuple] = []
+        loops: List[Any] = []
+
+        if args is not None:
+            frames.append(CallFrame(args))
+
+        instructions = code.instructions
+        pc = 0
+
+        try:
+            while True:
+                op, arg = instructions[pc]
+                pc += 1
+                if op_counts is not None:
+                    op_counts[op] += 1
+
+                if op == PUSH_CONST:
+                    stack.append(arg)
+                elif op == ARG:
+                    frame_args = frames[-1].args if frames else []
+                    stack.append(frame_args[arg - 1] if 0 < arg <= len(frame_args) else None)
+                elif op == BINARY:
+                    right = stack.pop()
+                    stack[-1] = arg(stack[-1], right)
+                elif op == JUMP_IF_FALSE:
+                    if not stack.pop():
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == CALL_PREPARE:
+                    entry = namespace.get(arg.word_id)
+                    if isinstance(entry, dict) and 'code' in entry and entry['arity'] == arg.argc:
+                        stack.append(entry)
+                        if metrics is not None:
+                            metrics.count(f"function.{arg.word_id}")
+                    else:
+                        stack.append(self._call_fallback(arg, entry))
+                        pc = arg.end
+                elif op == CALL:
+                    if arg:
+                        call_args = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        call_args = []
+                    entry = stack.pop()
+                    frames.append(CallFrame(call_args))
+                    calls.append((instructions, pc))
+                    instructions = entry['code'].instructions
+                    pc = 0
+                    if budget is not None:
+                        budget.call(len(frames) - 1)
+                    if pause_every:
+                        countdown -= 1
+                        if not countdown:
+                            countdown = pause_every
+                            yield
+                elif op == RETURN:
+                    frames.pop()
+                    if not calls:
+                        return stack.pop()
+                    instructions, pc = calls.pop()
+                elif op == KEEP:
+                    value = stack.pop()
+                    if value is not None:
+                        stack[-1] = value
+                elif op == POP:
+                    stack.pop()
+                elif op == LOOP_TIMES:
+                    loop = loops[-1]
+                    if loop[0] <= 0:
+                        loops.pop()
+                        times_stack.pop()
+                        pc = arg
+                    else:
+                        loop[0] -= 1
+                        stack.pop()
+                        if budget is not None:
+                            budget.step()
+                        if pause_every:
+                            countdown -= 1
+                            if not countdown:
+                                countdown = pause_every
+                                yield
+                elif op == TIMES_STEP:
+                    times_stack[-1].count += 1
+                    pc = arg
+                elif op == TIMES_SETUP:
+                    loops.append([int(stack.pop())])
+                    times_stack.append(TimesCounter())
+                    stack.append(None)
+                elif op == TIMES_COUNT_AT:
+                    stack.append(times_stack[-arg].count if times_stack else 0)
+                elif op == TIMES_COUNT:
+                    depth = stack.pop()
+                    stack.append(times_stack[-depth].count if times_stack else 0)
+                elif op == PRINT:
+                    write(f"{stack[-1]}\n")
+                elif op == UNARY:
+                    stack[-1] = arg(stack[-1])
+                elif op == ARG_DYNAMIC:
+                    index = stack.pop()
+                    if frames:
+                        frame_args = frames[-1].args
+                        stack.append(frame_args[index - 1] if 0 < index <= len(frame_args) else None)
+                    else:
+                        stack.append(None)
+                elif op == LOOP_EACH:
+                    items = loops[-1]
+                    state = each_stack[-1]
+                    item = None if state['stop'] else next(items, None)
+                    if item is None:
+                        loops.pop()
+                        each_stack.pop()
+                        pc = arg
+                    else:
+                        state['iter'] = {'v': item[1], 'k': item[0]}
+                        stack.pop()
+                        if budget is not None:
+                            budget.step()
+                        if pause_every:
+                            countdown -= 1
+                            if not countdown:
+                                countdown = pause_every
+                                yield
+                elif op == EACH_SETUP:
+                    iterable = stack.pop()
+                    if isinstance(iterable, dict):
+                        items = iter(iterable.items())
+                    elif isinstance(iterable, list):
+                        items = enumerate(iterable)
+                    else:
+                        items = iter(())
+                    loops.append(items)
+                    each_stack.append({'stop': False})
+                    stack.append(None)
+                elif op == BUILD_LIST:
+                    if arg:
+                        values = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        values = []
+                    stack.append(values)
+                elif op == BUILD_MAP:
+                    values = stack[-arg:] if arg else []
+                    if arg:
+                        del stack[-arg:]
+                    stack.append({values[i]: values[i + 1] for i in range(0, len(values) - 1, 2)})
+                elif op == PUSH_JSON:
+                    stack.append(self._parse(arg))
+                elif op == GUARD:
+                    entry = namespace.get(arg.word_id)
+                    if entry is not arg.entry:
+                        stack.append(self._call_fallback(arg, entry))
+                        pc = arg.end
+                elif op == CALL_BUILTIN:
+                    func, params = arg
+                    stack.append(func(params))
+                elif op == DEF:
+                    func_id, arity, body, body_index, pure = arg
+                    self._define(func_id, self._function_entry(arity, body), body_index, pure)
+                    stack.append(None)
+                elif op == ERROR:
+                    self._write(arg)
+                    stack.append(None)
+                elif op == HALT:
+                    return stack.pop()
+                else:
+                    raise RuntimeError(f"Unknown opcode: {op}")
+        except BaseException:
+            # Unwind frames and loops opened by this run
+            del frames[depths[0]:]
+            del times_stack[depths[1]:]
+            del each_stack[depths[2]:]
+            raise
+        finally:
+            if op_counts is not None:
+                for op, executed in enumerate(op_counts):
+                    if executed:
+                        metrics.count(f"opcode.{OPCODE_NAMES[op]}", executed)
+
+    def _call_fallback(self, site: CallSite, entry: Any) -> Any:
+        """Handle a call that cannot enter bytecode directly"""
+        if entry is None:
+            self._write(f"Undefined id: {site.word_id}")
+            return None
+
+        if isinstance(entry, dict) and 'func' in entry:
+            if self.metrics is not None:
+                kind = 'function' if 'invoke' in entry else 'builtin'
+                self.metrics.count(f"{kind}.{site.word_id}")
+            params = self._param_indices(site.word_index + 1, entry['arity'])
+            return entry['func'](params)
+
+        self._write(f"Not handled, word: {self.words[site.word_index]}")
+        return None
+
+
+def main():
+    """Run the bytecode VM on a small program"""
+    vm = PangeaVM()
+    vm.exec('''
+    def deep_recursion#1
+    if ( arg 1 ) == 0
+     0
+     deep_recursion ( ( arg 1 ) - 1 )
+    ''')
+    print(vm.exec('deep_recursion 100000'))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,361 +1,446 @@
 #!/usr/bin/env python3
 """
 Performance Benchmark Suite for Pangea Python Interpreter
-Detailed performance analysis and comparison with baseline expectations
+Timings of the tree walker, PangeaVM and Plan engines, comparable across commits
+
+Every workload is timed on each engine that runs its language:
+
+- setup (resetting the interpreter, defining functions, parsing a Plan)
+  happens outside the timer, so only execution is measured;
+- warmup runs come first, so caches have settled before timing starts;
+- the runs per sample are calibrated until a sample lasts min_time
+  seconds, keeping timer resolution negligible;
+- repeat samples give the mean seconds per run with a 95% confidence
+  interval (Student's t);
+- program output is discarded, and garbage collection is off while a
+  sample runs;
+- each program's result and output are checked first, so a workload
+  that hits an error path fails instead of timing the error.
+
+Results are written as JSON. With --compare old.json, workloads whose
+mean moved by more than --threshold, with confidence intervals that do
+not overlap, are reported; a regression makes the exit status 1.
+
+    python3 performance_benchmark.py --output before.json
+    python3 performance_benchmark.py --compare before.json
 """
 
+import gc
+import io
+import os
+import sys
+import json
+import math
 import time
+import argparse
+import platform
 import statistics
-import matplotlib.pyplot as plt
-import json
-from pangea_python_interpreter import PangeaInterpreter
-
-
-class PerformanceBenchmark:
-    def __init__(self):
-        self.results = {}
-        self.baseline_expectations = {
-            # Expected maximum times for production readiness (seconds)
-            'simple_print': 0.001,
-            'factorial_10': 0.01,
-            'fibonacci_15': 0.1,
-            'fizzbuzz_100': 0.05,
-            'loop_1000': 0.02,
-            'large_array_100': 0.01,
-            'nested_objects': 0.005,
-            'recursive_50': 0.02,
-        }
-    
-    def benchmark_function(self, name, func, iterations=10):
-        """Benchmark a function multiple times for statistical accuracy"""
-        times = []
-        
-        for i in range(iterations):
-            start_time = time.perf_counter()
-            try:
-                result = func()
-                end_time = time.perf_counter()
-                times.append(end_time - start_time)
-            except Exception as e:
-                print(f"❌ {name} failed on iteration {i+1}: {e}")
-                return None
-        
-        # Calculate statistics
-        stats = {
-            'mean': statistics.mean(times),
-            'median': statistics.median(times),
-            'stdev': statistics.stdev(times) if len(times) > 1 else 0,
-            'min': min(times),
-            'max': max(times),
-            'iterations': iterations,
-            'raw_times': times
-        }
-        
-        self.results[name] = stats
-        
-        # Check against baseline
-        baseline = self.baseline_expectations.get(name)
-        status = "✅" if baseline and stats['mean'] <= baseline else "⚠️" if baseline else "ℹ️"
-        
-        print(f"{status} {name}:")
-        print(f"    Mean: {stats['mean']:.6f}s ± {stats['stdev']:.6f}s")
-        print(f"    Range: {stats['min']:.6f}s - {stats['max']:.6f}s")
-        if baseline:
-            ratio = stats['mean'] / baseline
-            print(f"    vs Baseline: {ratio:.2f}x ({'PASS' if ratio <= 1 else 'SLOW'})")
-        
-        return stats
-    
-    def run_all_benchmarks(self):
-        """Run comprehensive performance benchmarks"""
-        print("🏁 PANGEA PERFORMANCE BENCHMARK SUITE")
-        print("=" * 50)
-        
-        # Basic operations
-        print("\n📊 Basic Operations")
-        print("-" * 25)
-        
-        self.benchmark_function("simple_print", lambda: self.simple_print())
-        self.benchmark_function("arithmetic_ops", lambda: self.arithmetic_operations())
-        self.benchmark_function("string_ops", lambda: self.string_operations())
-        
-        # Algorithmic tests
-        print("\n🧮 Algorithmic Performance")
-        print("-" * 30)
-        
-        self.benchmark_function("factorial_10", lambda: self.factorial_test(10))
-        self.benchmark_function("fibonacci_15", lambda: self.fibonacci_test(15))
-        self.benchmark_function("fizzbuzz_100", lambda: self.fizzbuzz_test(100))
-        
-        # Data structure tests
-        print("\n📦 Data Structure Performance")
-        print("-" * 35)
-        
-        self.benchmark_function("large_array_100", lambda: self.large_array_test(100))
-        self.benchmark_function("nested_objects", lambda: self.nested_objects_test())
-        self.benchmark_function("array_iteration", lambda: self.array_iteration_test())
-        
-        # Control flow tests
-        print("\n🔄 Control Flow Performance")
-        print("-" * 32)
-        
-        self.benchmark_function("loop_1000", lambda: self.loop_test(1000))
-        self.benchmark_function("recursive_50", lambda: self.recursive_test(50))
-        self.benchmark_function("conditional_chains", lambda: self.conditional_test())
-        
-        # Memory intensive tests
-        print("\n💾 Memory Performance")
-        print("-" * 25)
-        
-        self.benchmark_function("large_computation", lambda: self.large_computation_test())
-        self.benchmark_function("function_definitions", lambda: self.function_definition_test())
-        
-        self.generate_report()
-    
-    # Individual benchmark functions
-    def simple_print(self):
-        interpreter = PangeaInterpreter()
-        return interpreter.exec('print "hello"')
-    
-    def arithmetic_operations(self):
-        interpreter = PangeaInterpreter()
-        return interpreter.exec('( 42 + 13 ) * ( 7 - 3 ) / 2')
-    
-    def string_operations(self):
-        interpreter = PangeaInterpreter()
-        return interpreter.exec('print "test+string+with+plus+signs"')
-    
-    def factorial_test(self, n):
-        interpreter = PangeaInterpreter()
-        interpreter.exec('''
-            def factorial#1
-            if ( arg 1 ) == 0
-             1
-             ( arg 1 ) * factorial ( ( arg 1 ) - 1 )
-        ''')
-        return interpreter.exec(f'factorial {n}')
-    
-    def fibonacci_test(self, n):
-        interpreter = PangeaInterpreter()
-        interpreter.exec('''
-            def fib#1
-            if ( arg 1 ) < 2
-             arg 1
-             ( fib ( ( arg 1 ) - 1 ) ) + ( fib ( ( arg 1 ) - 2 ) )
-        ''')
-        return interpreter.exec(f'fib {n}')
-    
-    def fizzbuzz_test(self, n):
-        interpreter = PangeaInterpreter()
-        interpreter.exec(f'''
-            def multiple#2
-            0 == ( ( arg 1 ) % ( arg 2 ) )
-            
-            def i#0
-            times_count 1
-            
-            {n} times (
-                "fizzbuzz" when multiple i 15
-                "fizz" when multiple i 3
-                "buzz" when multiple i 5
-                i
-            )
-        ''')
-        return True
-    
-    def large_array_test(self, size):
-        interpreter = PangeaInterpreter()
-        elements = " ".join([str(i) for i in range(size)])
-        return interpreter.exec(f'[ {elements} ]')
-    
-    def nested_objects_test(self):
-        interpreter = PangeaInterpreter()
-        return interpreter.exec('''
-            {
-                "level1" {
-                    "level2" {
-                        "level3" {
-                            "data" [ 1 2 3 4 5 ]
-                            "value" 42
-                        }
-                    }
-                }
-                "array" [ { "id" 1 } { "id" 2 } { "id" 3 } ]
-            }
-        ''')
-    
-    def array_iteration_test(self):
-        interpreter = PangeaInterpreter()
-        return interpreter.exec('''
-            [ 1 2 3 4 5 6 7 8 9 10 ] each (
-                each_item * 2
-            )
-        ''')
-    
-    def loop_test(self, iterations):
-        interpreter = PangeaInterpreter()
-        return interpreter.exec(f'{iterations} times pass')
-    
-    def recursive_test(self, depth):
-        interpreter = PangeaInterpreter()
-        interpreter.exec('''
-            def countdown#1
-            if ( arg 1 ) == 0
-             0
-             countdown ( ( arg 1 ) - 1 )
-        ''')
-        return interpreter.exec(f'countdown {depth}')
-    
-    def conditional_test(self):
-        interpreter = PangeaInterpreter()
-        return interpreter.exec('''
-            print
-            "case1" when 1 == 1
-            "case2" when 2 == 2  
-            "case3" when 3 == 3
-            "default"
-        ''')
-    
-    def large_computation_test(self):
-        interpreter = PangeaInterpreter()
-        # Complex nested computation
-        return interpreter.exec('''
-            def complex_calc#3
-            ( ( arg 1 ) + ( arg 2 ) ) * ( arg 3 ) / 2
-            
-            complex_calc ( 100 + 200 ) ( 300 - 50 ) ( 75 * 2 )
-        ''')
-    
-    def function_definition_test(self):
-        interpreter = PangeaInterpreter()
-        # Define multiple functions
-        interpreter.exec('''
-            def f1#1 arg 1
-            def f2#2 ( arg 1 ) + ( arg 2 )
-            def f3#3 f2 ( arg 1 ) ( f2 ( arg 2 ) ( arg 3 ) )
-        ''')
-        return interpreter.exec('f3 1 2 3')
-    
-    def generate_report(self):
-        """Generate detailed performance report"""
-        print("\n" + "=" * 50)
-        print("📈 PERFORMANCE ANALYSIS REPORT")
-        print("=" * 50)
-        
-        # Overall statistics
-        all_times = []
-        for result in self.results.values():
-            all_times.extend(result['raw_times'])
-        
-        if all_times:
-            print(f"\n📊 Overall Statistics:")
-            print(f"Total Tests: {len(self.results)}")
-            print(f"Total Measurements: {len(all_times)}")
-            print(f"Overall Mean Time: {statistics.mean(all_times):.6f}s")
-            print(f"Overall Median Time: {statistics.median(all_times):.6f}s")
-        
-        # Baseline comparison
-        print(f"\n🎯 Baseline Comparison:")
-        passed_baselines = 0
-        total_baselines = 0
-        
-        for test_name, baseline_time in self.baseline_expectations.items():
-            if test_name in self.results:
-                actual_time = self.results[test_name]['mean']
-                ratio = actual_time / baseline_time
-                status = "PASS" if ratio <= 1.0 else "SLOW"
-                print(f"  {test_name}: {ratio:.2f}x baseline ({status})")
-                
-                if ratio <= 1.0:
-                    passed_baselines += 1
-                total_baselines += 1
-        
-        if total_baselines > 0:
-            baseline_success_rate = (passed_baselines / total_baselines) * 100
-            print(f"\nBaseline Success Rate: {baseline_success_rate:.1f}%")
-        
-        # Performance recommendations
-        print(f"\n💡 Performance Recommendations:")
-        
-        slow_tests = []
-        for name, result in self.results.items():
-            baseline = self.baseline_expectations.get(name)
-            if baseline and result['mean'] > baseline * 1.5:
-                slow_tests.append((name, result['mean'] / baseline))
-        
-        if slow_tests:
-            print("  ⚠️  Tests significantly slower than baseline:")
-            for test_name, ratio in slow_tests:
-                print(f"    • {test_name}: {ratio:.2f}x slower")
-        else:
-            print("  ✅ All tests meet or exceed performance expectations!")
-        
-        # Variability analysis
-        high_variability = []
-        for name, result in self.results.items():
-            if result['stdev'] > result['mean'] * 0.2:  # >20% coefficient of variation
-                cv = (result['stdev'] / result['mean']) * 100
-                high_variability.append((name, cv))
-        
-        if high_variability:
-            print(f"\n  📊 Tests with high variability (>20% CV):")
-            for test_name, cv in high_variability:
-                print(f"    • {test_name}: {cv:.1f}% coefficient of variation")
-        
-        # Save detailed results
-        self.save_results_json()
-        
-        # Final verdict
-        print(f"\n🏆 PERFORMANCE VERDICT:")
-        
-        if baseline_success_rate >= 90:
-            print("🚀 EXCELLENT - Ready for production!")
-        elif baseline_success_rate >= 75:
-            print("✅ GOOD - Minor optimizations recommended")
-        elif baseline_success_rate >= 60:
-            print("⚠️  FAIR - Performance improvements needed")
+import subprocess
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List, Optional
+
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer
+from pangea_vm import PangeaVM
+import plan_words_parsing
+import plan_words_evaluation
+
+
+# Version of the results file format
+RESULTS_VERSION = 1
+
+DEFAULT_OUTPUT = 'performance_benchmark_results.json'
+
+# Two-sided 95% quantiles of Student's t by degrees of freedom
+_T95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+FACTORIAL = '''
+def factorial#1
+if ( arg 1 ) == 0
+ 1
+ ( arg 1 ) * factorial ( ( arg 1 ) - 1 )
+'''
+
+FIB = '''
+def fib#1
+if ( arg 1 ) < 2
+ arg 1
+ ( fib ( ( arg 1 ) - 1 ) ) + ( fib ( ( arg 1 ) - 2 ) )
+'''
+
+FIZZBUZZ = '''
+def multiple#2
+0 == ( ( arg 1 ) % ( arg 2 ) )
+
+def i#0
+times_count 1
+'''
+
+COUNTDOWN = '''
+def countdown#1
+if ( arg 1 ) == 0
+ 0
+ countdown ( ( arg 1 ) - 1 )
+'''
+
+
+class Workload:
+    """A program timed on one engine
+
+    setup runs untimed before every run, on a reset interpreter (Pangea)
+    or with an empty function registry (Plan); only run is timed. Before
+    timing, run must return result and write output (Plan programs
+    always return None), so the timings are of the program as intended
+    rather than of an error path.
+    """
+
+    __slots__ = ('name', 'engine', 'setup', 'run', 'result', 'output')
+
+    def __init__(self, name: str, engine: str, setup: str, run: str,
+                 result: Any = None, output: str = ''):
+        self.name = name
+        self.engine = engine
+        self.setup = setup
+        self.run = run
+        self.result = result
+        self.output = output
+
+    @property
+    def key(self) -> str:
+        return f"{self.engine}/{self.name}"
+
+
+# (name, setup, run, result, output) of the Pangea workloads, run by the
+# tree walker and the VM
+PANGEA_WORKLOADS = [
+    ('simple_print', '', 'print "hello"', 'hello', 'hello\n'),
+    ('arithmetic_ops', '', '( ( 42 + 13 ) * ( 7 - 3 ) ) % 9', 4, ''),
+    ('string_ops', '', 'print "test+string+with+plus+signs"',
+     'test string with plus signs', 'test string with plus signs\n'),
+    ('factorial_10', FACTORIAL, 'factorial 10', 3628800, ''),
+    ('fibonacci_15', FIB, 'fib 15', 610, ''),
+    ('fizzbuzz_100', FIZZBUZZ, '''
+        100 times (
+            "fizzbuzz" when multiple i 15
+            "fizz" when multiple i 3
+            "buzz" when multiple i 5
+            i
+        )''', 'buzz', ''),
+    ('large_array_100', '', '[ ' + ' '.join(str(i) for i in range(100)) + ' ]', list(range(100)), ''),
+    ('nested_objects', '', '''
+        {
+            "level1" { "level2" { "level3" { "data" [ 1 2 3 4 5 ] "value" 42 } } }
+            "array" [ { "id" 1 } { "id" 2 } { "id" 3 } ]
+        }''',
+     {'level1': {'level2': {'level3': {'data': [1, 2, 3, 4, 5], 'value': 42}}},
+      'array': [{'id': 1}, {'id': 2}, {'id': 3}]}, ''),
+    ('array_iteration', '', '[ 1 2 3 4 5 6 7 8 9 10 ] each ( each_item * 2 )', 20, ''),
+    ('loop_1000', '', '1000 times pass', None, ''),
+    ('recursive_50', COUNTDOWN, 'countdown 50', 0, ''),
+    ('conditional_chains', '', '''
+        print
+        "case1" when 1 == 1
+        "case2" when 2 == 2
+        "case3" when 3 == 3
+        "default"''', 'case1', 'case1\n'),
+    ('large_computation', 'def complex_calc#3 ( ( ( arg 1 ) + ( arg 2 ) ) * ( arg 3 ) ) % 1000',
+     'complex_calc ( 100 + 200 ) ( 300 - 50 ) ( 75 * 2 )', 500, ''),
+    ('function_definitions', '', '''
+        def f1#1 arg 1
+        def f2#2 ( arg 1 ) + ( arg 2 )
+        def f3#3 f2 ( arg 1 ) ( f2 ( arg 2 ) ( arg 3 ) )
+        f3 1 2 3''', 6, ''),
+]
+
+# (name, setup, run, output) of the Plan workloads. Plan's each and times
+# run their block only once and its when does not stop writeln, so none
+# of them is timed until the evaluator runs them as documented.
+PLAN_WORKLOADS = [
+    ('writeln', '', 'writeln "hello"', 'hello\n'),
+    ('arithmetic', '', 'writeln 42 + 13 writeln 7 * 6 writeln 2 ** 10 writeln 100 % 7',
+     '55\n42\n1024\n2\n'),
+    ('function_calls', 'def add#2 arg 1 + arg 2', ' '.join(['writeln add 3 4'] * 10), '7\n' * 10),
+    ('if', 'def test#1 arg 1 == 42',
+     'if test 42 { writeln "yes" } if test 10 { writeln "no" }', 'yes\n'),
+]
+
+ENGINES = {'tree': PangeaInterpreter, 'vm': PangeaVM}
+
+
+def workloads(engines: List[str], name_filter: str = '') -> List[Workload]:
+    """The workloads of the given engines whose key contains name_filter"""
+    selected = []
+    for engine in engines:
+        if engine == 'plan':
+            programs = [Workload(name, engine, setup, run, None, output)
+                        for name, setup, run, output in PLAN_WORKLOADS]
         else:
-            print("❌ POOR - Significant optimization required")
-    
-    def save_results_json(self):
-        """Save detailed results to JSON file"""
-        # Convert results to JSON-serializable format
-        json_results = {}
-        for name, result in self.results.items():
-            json_results[name] = {
-                'mean': result['mean'],
-                'median': result['median'],
-                'stdev': result['stdev'],
-                'min': result['min'],
-                'max': result['max'],
-                'iterations': result['iterations']
-            }
-        
-        # Add metadata
-        json_data = {
-            'timestamp': time.time(),
-            'baseline_expectations': self.baseline_expectations,
-            'results': json_results
-        }
-        
-        with open('performance_benchmark_results.json', 'w') as f:
-            json.dump(json_data, f, indent=2)
-        
-        print(f"\n💾 Detailed results saved to: performance_benchmark_results.json")
-
-
-def main():
-    """Run the performance benchmark suite"""
+            programs = [Workload(name, engine, *program) for name, *program in PANGEA_WORKLOADS]
+        selected.extend(workload for workload in programs if name_filter in workload.key)
+    return selected
+
+
+class WorkloadError(Exception):
+    """A workload's program did not return or write what it should"""
+
+
+class _Discard(io.TextIOBase):
+    """A text stream that drops everything written to it"""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+class Runner:
+    """Prepares runs of one workload, each ready to execute its run code
+
+    Pangea interpreters are built once and reset() between runs, so
+    neither construction nor setup code is timed.
+    """
+
+    def __init__(self, workload: Workload, batch_size: int = 100):
+        self.workload = workload
+        self.batch_size = batch_size
+        self._interpreters: List[PangeaInterpreter] = []
+        if workload.engine == 'plan':
+            self._setup_words = plan_words_parsing.words_parse(workload.setup)
+            self._run_words = plan_words_parsing.words_parse(workload.run)
+
+    def prepare(self, count: int) -> List[Callable[[], Any]]:
+        """Up to batch_size runs, set up and ready to be timed"""
+        count = min(count, self.batch_size)
+        if self.workload.engine == 'plan':
+            return self._prepare_plan(count)
+
+        interpreter_class = ENGINES[self.workload.engine]
+        while len(self._interpreters) < count:
+            self._interpreters.append(interpreter_class(output=OutputBuffer(capture=True)))
+        runs = []
+        for interpreter in self._interpreters[:count]:
+            interpreter.reset()
+            if self.workload.setup:
+                interpreter.exec(self.workload.setup)
+                interpreter.output.clear()
+            runs.append(lambda exec=interpreter.exec, code=self.workload.run: exec(code))
+        return runs
+
+    def _prepare_plan(self, count: int) -> List[Callable[[], Any]]:
+        # The Plan engine keeps its state in module globals, shared by all runs
+        plan_words_evaluation.function_registry.clear()
+        plan_words_evaluation.evaluate_plan(self._setup_words)
+        run_words = self._run_words
+        return [lambda: plan_words_evaluation.evaluate_plan(run_words)] * count
+
+    def check(self):
+        """Raise WorkloadError unless a run returns and writes what it should"""
+        with redirect_stdout(_Discard()):
+            run = self.prepare(1)[0]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            result = run()
+        if self.workload.engine != 'plan':
+            output = self._interpreters[0].output
+        expected = (self.workload.result, self.workload.output)
+        if (result, output.getvalue()) != expected:
+            raise WorkloadError(f"{self.workload.key} returned {result!r} and wrote "
+                                f"{output.getvalue()!r}, expected {expected[0]!r} and {expected[1]!r}")
+
+    def time(self, number: int) -> float:
+        """Seconds taken by number runs, excluding their setup"""
+        total = 0.0
+        done = 0
+        while done < number:
+            runs = self.prepare(number - done)
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                start_time = time.perf_counter()
+                for run in runs:
+                    run()
+                total += time.perf_counter() - start_time
+            finally:
+                if gc_enabled:
+                    gc.enable()
+            done += len(runs)
+        return total
+
+
+def t95(degrees_of_freedom: int) -> float:
+    """Two-sided 95% quantile of Student's t"""
+    if degrees_of_freedom <= len(_T95):
+        return _T95[degrees_of_freedom - 1]
+    return statistics.NormalDist().inv_cdf(0.975)
+
+
+def summarize(times: List[float], number: int) -> Dict[str, Any]:
+    """Statistics of per-run seconds, one value per sample"""
+    mean = statistics.mean(times)
+    stdev = statistics.stdev(times) if len(times) > 1 else 0.0
+    half_width = t95(len(times) - 1) * stdev / math.sqrt(len(times)) if len(times) > 1 else 0.0
+    return {
+        'mean': mean,
+        'stdev': stdev,
+        'median': statistics.median(times),
+        'min': min(times),
+        'max': max(times),
+        'ci_low': mean - half_width,
+        'ci_high': mean + half_width,
+        'samples': len(times),
+        'number': number,
+        'times': times,
+    }
+
+
+def calibrate(runner: Runner, min_time: float) -> int:
+    """Runs per sample, grown in 1, 2, 5, 10, ... steps as timeit does"""
+    scale = 1
+    while True:
+        for number in (scale, 2 * scale, 5 * scale):
+            if runner.time(number) >= min_time:
+                return number
+        scale *= 10
+
+
+def measure(workload: Workload, repeat: int = 10, min_time: float = 0.05,
+            warmup: float = 0.1) -> Dict[str, Any]:
+    """Warm up, calibrate and sample one workload"""
+    runner = Runner(workload)
+    runner.check()
+    with redirect_stdout(_Discard()):
+        deadline = time.perf_counter() + warmup
+        while time.perf_counter() < deadline:
+            runner.time(1)
+
+        number = calibrate(runner, min_time)
+        times = [runner.time(number) / number for _ in range(repeat)]
+    return summarize(times, number)
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any],
+            threshold: float) -> Dict[str, List[str]]:
+    """Workloads slower or faster than in baseline by more than threshold
+
+    A change counts only when the confidence intervals do not overlap,
+    so noise within a run's own spread is never reported.
+    """
+    changes: Dict[str, List[str]] = {'regressions': [], 'improvements': []}
+    old_results = baseline.get('results', {})
+    for key, new in results.items():
+        old = old_results.get(key)
+        if old is None:
+            continue
+        ratio = new['mean'] / old['mean']
+        if ratio > 1 + threshold and new['ci_low'] > old['ci_high']:
+            changes['regressions'].append(key)
+        elif ratio < 1 - threshold and new['ci_high'] < old['ci_low']:
+            changes['improvements'].append(key)
+    return changes
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def git_commit() -> Optional[str]:
+    """The commit of the working tree, if it is a git checkout"""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def run_benchmarks(selected: List[Workload], repeat: int, min_time: float,
+                   warmup: float) -> Dict[str, Any]:
+    """Measure the workloads, printing a line per workload"""
+    results = {}
+    print(f"{'workload':<32} {'mean':>12} {'± 95% CI':>12} {'runs':>8}")
+    for workload in selected:
+        stats = measure(workload, repeat, min_time, warmup)
+        results[workload.key] = stats
+        half_width = stats['ci_high'] - stats['mean']
+        print(f"{workload.key:<32} {format_seconds(stats['mean']):>12} "
+              f"{format_seconds(half_width):>12} {stats['number'] * stats['samples']:>8}")
+    return results
+
+
+def print_comparison(baseline: Dict[str, Any], results: Dict[str, Any], threshold: float,
+                     changes: Dict[str, List[str]]):
+    print(f"\nCompared with {(baseline.get('commit') or 'baseline')[:12]} (threshold {threshold:.0%}):")
+    old_results = baseline.get('results', {})
+    for key, new in results.items():
+        old = old_results.get(key)
+        if old is None:
+            print(f"  {key:<32} new")
+            continue
+        change = new['mean'] / old['mean'] - 1
+        status = ('REGRESSION' if key in changes['regressions']
+                  else 'improved' if key in changes['improvements'] else '')
+        print(f"  {key:<32} {format_seconds(old['mean']):>12} -> {format_seconds(new['mean']):>12} "
+              f"{change:+8.1%}  {status}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark suite, returning 1 if --compare finds a regression
+    and 2 if a workload does not produce its expected result
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Pangea and Plan engines")
+    parser.add_argument('-e', '--engine', action='append', choices=['tree', 'vm', 'plan'],
+                        help="engine to benchmark, repeatable (default: all)")
+    parser.add_argument('-k', '--filter', default='',
+                        help="only workloads whose engine/name contains this text")
+    parser.add_argument('-r', '--repeat', type=int, default=10, help="samples per workload")
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help="seconds a sample lasts at least (default 0.05)")
+    parser.add_argument('--warmup', type=float, default=0.1,
+                        help="seconds of warmup runs per workload (default 0.1)")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument('--compare', metavar='BASELINE', help="JSON results to compare with")
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help="relative change reported by --compare (default 0.05)")
+    args = parser.parse_args(argv)
+    if args.repeat < 2:
+        parser.error("--repeat must be at least 2 for a confidence interval")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    selected = workloads(args.engine or ['tree', 'vm', 'plan'], args.filter)
     try:
-        benchmark = PerformanceBenchmark()
-        benchmark.run_all_benchmarks()
-    except KeyboardInterrupt:
-        print("\n⚠️  Benchmark interrupted by user")
-    except Exception as e:
-        print(f"\n💥 Benchmark suite crashed: {e}")
-        import traceback
-        traceback.print_exc()
+        results = run_benchmarks(selected, args.repeat, args.min_time, args.warmup)
+    except WorkloadError as e:
+        print(f"Workload failed its check: {e}", file=sys.stderr)
+        return 2
+
+    report = {
+        'version': RESULTS_VERSION,
+        'timestamp': time.time(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {'repeat': args.repeat, 'min_time': args.min_time, 'warmup': args.warmup},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {args.output}")
+
+    if baseline is not None:
+        changes = compare(baseline, results, args.threshold)
+        print_comparison(baseline, results, args.threshold, changes)
+        if changes['regressions']:
+            print(f"\nRegressed: {', '.join(changes['regressions'])}", file=sys.stderr)
+            return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
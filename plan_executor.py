@@ -3,6 +3,8 @@
 import sys
 import plan_words_parsing
 import plan_words_evaluation
+from source_loading import mapped_lines
+from program_cache import load_plan_words
 
 
 # execute the plan
@@ -11,18 +13,28 @@ def execute_plan(plan_to_execute):
     plan_words_evaluation.evaluate_plan(plan_words)
 
 
+# execute a plan file, its parsed words cached in __pangea_cache__/
+def execute_plan_file(plan_file, use_cache=True):
+    if use_cache:
+        plan_words_evaluation.evaluate_plan(load_plan_words(plan_file))
+    else:
+        # read the plan a line at a time from a memory map
+        execute_plan(mapped_lines(plan_file))
+
+
 # entry point
 if __name__ == "__main__":
     # check for command line arguments
-    if len(sys.argv) > 1:
-        plan_file = sys.argv[1]
+    use_cache = "--no-cache" not in sys.argv[1:]
+    arguments = [argument for argument in sys.argv[1:] if argument != "--no-cache"]
+    if arguments:
+        plan_file = arguments[0]
     else:
         plan_file = "example_plans/testing.plan"
     
     # execute the plan
     try:
-        with open(plan_file, 'r') as f:
-            execute_plan(f.read())
+        execute_plan_file(plan_file, use_cache)
     except FileNotFoundError:
         print(f"Error: Plan file '{plan_file}' not found.")
     except Exception as e:
@@ -4,6 +4,16 @@
 
 # Core evaluation system with boolean literals and basic operators
 
+# Trust boundary: Plan programs are trusted code. Function bodies are
+# compiled and run as Python expressions, like the eval keyword and the
+# literal parsing below. Running bodies without builtins only keeps them
+# from reaching Python functions by name; it is not a sandbox, as objects
+# still lead back to every class (e.g. through ().__class__.__mro__).
+# Never evaluate Plan source from an untrusted party.
+
+from plan_words_parsing import opening_brackets, closing_brackets, classify_word, WORD_OTHER
+from execution_budget import BudgetExceeded
+
 plan_eval_debug_flag = False
 
 # Global state
@@ -13,6 +23,11 @@ call_stack = []
 each_stack = []
 each_item_stack = []
 
+# limits of the running plan (an ExecutionBudget, None for unlimited) and
+# the characters it has written
+execution_budget = None
+output_written = 0
+
 # Enhanced operator definitions with more comprehensive support
 infix_operators = {
     '+': lambda a, b: a + b,
@@ -42,6 +57,12 @@ def debug_print(*args):
 
 # Enhanced skip_block to handle nested structures
 def skip_block(plan_words, start_i):
+    # Parsed plans carry a jump table of matching brackets
+    bracket_matches = getattr(plan_words, 'bracket_matches', None)
+    if bracket_matches is not None and plan_words[start_i] in opening_brackets:
+        matching_i = bracket_matches[start_i]
+        return matching_i + 1 if matching_i >= 0 else len(plan_words)
+    
     nested_level = 0
     current_i = start_i
     while current_i < len(plan_words):
@@ -61,7 +82,7 @@ def evaluate_block(plan_words, start_i):
     current_i = start_i + 1
     while current_i < len(plan_words):
         word = plan_words[current_i]
-        if word in ["}", ")", "]"]:
+        if word in closing_brackets:
             return evaluated_word, current_i + 1
         result, current_i = evaluate_word(plan_words, current_i)
         if result is not None:
@@ -95,256 +116,343 @@ def handle_infix_operator(plan_words, current_i):
                 debug_print(f"Infix error: {e}")
     return None, None
 
-def evaluate_word(plan_words, current_i):
+# Translate a function body into Python source, binding "arg N" to the arguments
+def function_body_source(func_body, arg_count):
+    source_words = []
+    i = 0
+    while i < len(func_body):
+        word = func_body[i]
+        if (word == "arg" and i + 1 < len(func_body) and func_body[i + 1].isdigit() and
+                1 <= int(func_body[i + 1]) <= arg_count):
+            source_words.append(f"_args[{int(func_body[i + 1]) - 1}]")
+            i += 2
+        else:
+            source_words.append(word)
+            i += 1
+    return ' '.join(source_words)
+
+# Compile a function body once, at definition time
+def compile_function_body(func_body, arg_count):
+    try:
+        return compile(function_body_source(func_body, arg_count), '<plan def>', 'eval')
+    except (SyntaxError, ValueError):
+        # Not an expression, calls fall back to the body text
+        return None
+
+# Function bodies run without builtins, only their arguments are visible.
+# A body calling a Python builtin (len, abs, ...) raises NameError and so
+# falls back to its text. This narrows what bodies can name; it does not
+# make untrusted bodies safe (see the trust boundary note at the top).
+function_body_globals = {'__builtins__': {}}
+
+# Fall back to the body text with the arguments substituted in
+def function_body_text(func_def, args):
+    func_body_str = ' '.join(func_def['body'])
+    for i in range(len(args)):
+        func_body_str = func_body_str.replace(f'arg {i+1}', str(args[i]))
+    return func_body_str
+
+# Keyword handlers, called with the index of the keyword and of the word after it
+
+# Boolean literals
+def evaluate_true(plan_words, current_i, next_i):
+    return True, next_i
+
+def evaluate_false(plan_words, current_i, next_i):
+    return False, next_i
+
+# Basic output
+def evaluate_writeln(plan_words, current_i, next_i):
+    if next_i < len(plan_words):
+        value, next_i = evaluate_word(plan_words, next_i)
+        end_char = "\n" if plan_words[current_i] == "writeln" else ""
+        print(value, end=end_char)
+        if execution_budget is not None:
+            global output_written
+            output_written += len(str(value)) + len(end_char)
+        return value, next_i
+    return None, next_i
+
+# Expression evaluation
+def evaluate_eval(plan_words, current_i, next_i):
+    if next_i < len(plan_words):
+        expr, next_i = evaluate_word(plan_words, next_i)
+        try:
+            return eval(str(expr)), next_i
+        except:
+            return expr, next_i
+    return None, next_i
+
+# Conditionals
+def evaluate_if(plan_words, current_i, next_i):
+    if next_i < len(plan_words):
+        condition, next_i = evaluate_word(plan_words, next_i)
+        if next_i < len(plan_words) and plan_words[next_i] == "{":
+            if condition:
+                result, next_i = evaluate_block(plan_words, next_i)
+                return result, next_i
+            else:
+                return None, skip_block(plan_words, next_i)
+    return None, next_i
+
+# Loops
+def evaluate_times(plan_words, current_i, next_i):
     global times_count
     
-    if current_i >= len(plan_words):
-        return None, current_i
-    
-    word = plan_words[current_i]
-    debug_print("evaluating:", word)
-    next_i = current_i + 1
-    
-    # Boolean literals
-    if word == "true":
-        return True, next_i
-    elif word == "false":
-        return False, next_i
-    
-    # Basic output
-    elif word == "writeln" or word == "write":
-        if next_i < len(plan_words):
-            value, next_i = evaluate_word(plan_words, next_i)
-            end_char = "\n" if word == "writeln" else ""
-            print(value, end=end_char)
-            return value, next_i
-        return None, next_i
-    
-    # Expression evaluation
-    elif word == "eval":
-        if next_i < len(plan_words):
-            expr, next_i = evaluate_word(plan_words, next_i)
-            try:
-                return eval(str(expr)), next_i
-            except:
-                return expr, next_i
-        return None, next_i
-    
-    # Conditionals
-    elif word == "if":
-        if next_i < len(plan_words):
-            condition, next_i = evaluate_word(plan_words, next_i)
-            if next_i < len(plan_words) and plan_words[next_i] == "{":
-                if condition:
-                    result, next_i = evaluate_block(plan_words, next_i)
-                    return result, next_i
-                else:
-                    return None, skip_block(plan_words, next_i)
-        return None, next_i
+    # Check for infix: N times { block }
+    if current_i > 0:
+        prev_word = plan_words[current_i - 1]
+        if prev_word.isdigit() and next_i < len(plan_words) and plan_words[next_i] == "{":
+            count = int(prev_word)
+            old_times_count = times_count
+            result = None
+            for i in range(count):
+                if execution_budget is not None:
+                    execution_budget.step()
+                times_count = i + 1
+                result, next_i = evaluate_block(plan_words, next_i)
+            times_count = old_times_count
+            return result, next_i
     
-    # Loops
-    elif word == "times":
-        # Check for infix: N times { block }
-        if current_i > 0:
-            prev_word = plan_words[current_i - 1]
-            if prev_word.isdigit() and next_i < len(plan_words) and plan_words[next_i] == "{":
-                count = int(prev_word)
-                old_times_count = times_count
-                result = None
-                for i in range(count):
-                    times_count = i + 1
-                    result, next_i = evaluate_block(plan_words, next_i)
-                times_count = old_times_count
-                return result, next_i
-        
-        # Prefix: times N { block }
+    # Prefix: times N { block }
+    if next_i < len(plan_words):
+        count, next_i = evaluate_word(plan_words, next_i)
+        if isinstance(count, int) and next_i < len(plan_words) and plan_words[next_i] == "{":
+            old_times_count = times_count
+            result = None
+            for i in range(count):
+                if execution_budget is not None:
+                    execution_budget.step()
+                times_count = i + 1
+                result, next_i = evaluate_block(plan_words, next_i)
+            times_count = old_times_count
+            return result, next_i
+    return None, next_i
+
+# Times counter
+def evaluate_times_count(plan_words, current_i, next_i):
+    return times_count, next_i
+
+# Function definition
+def evaluate_def(plan_words, current_i, next_i):
+    if next_i < len(plan_words):
+        func_def = plan_words[next_i]
+        next_i += 1
+        if "#" in func_def:
+            func_name, arg_count_str = func_def.split("#")
+            arg_count = int(arg_count_str)
+            
+            # Read function body until next function keyword or control structure
+            func_body = []
+            while (next_i < len(plan_words) and 
+                   plan_words[next_i] not in ["def", "times", "if", "writeln", "write", "print"] and
+                   not plan_words[next_i] in function_registry):
+                if plan_words[next_i] == "{":
+                    break
+                func_body.append(plan_words[next_i])
+                next_i += 1
+            
+            function_registry[func_name] = {
+                'arg_count': arg_count,
+                'body': func_body,
+                'code': compile_function_body(func_body, arg_count)
+            }
+            debug_print(f"Defined function: {func_name} with body: {func_body}")
+            return None, next_i
+    return None, next_i
+
+# Function call
+def evaluate_function_call(plan_words, current_i, next_i):
+    func_def = function_registry[plan_words[current_i]]
+    if execution_budget is not None:
+        # function bodies are single expressions, never nested calls
+        execution_budget.call(1)
+    args = []
+    for i in range(func_def['arg_count']):
         if next_i < len(plan_words):
-            count, next_i = evaluate_word(plan_words, next_i)
-            if isinstance(count, int) and next_i < len(plan_words) and plan_words[next_i] == "{":
-                old_times_count = times_count
-                result = None
-                for i in range(count):
-                    times_count = i + 1
-                    result, next_i = evaluate_block(plan_words, next_i)
-                times_count = old_times_count
-                return result, next_i
-        return None, next_i
-    
-    # Times counter
-    elif word == "times_count":
-        return times_count, next_i
+            arg_value, next_i = evaluate_word(plan_words, next_i)
+            args.append(arg_value)
     
-    # Function definition
-    elif word == "def":
-        if next_i < len(plan_words):
-            func_def = plan_words[next_i]
-            next_i += 1
-            if "#" in func_def:
-                func_name, arg_count_str = func_def.split("#")
-                arg_count = int(arg_count_str)
-                
-                # Read function body until next function keyword or control structure
-                func_body = []
-                while (next_i < len(plan_words) and 
-                       plan_words[next_i] not in ["def", "times", "if", "writeln", "write", "print"] and
-                       not plan_words[next_i] in function_registry):
-                    if plan_words[next_i] == "{":
-                        break
-                    func_body.append(plan_words[next_i])
-                    next_i += 1
-                
-                function_registry[func_name] = {
-                    'arg_count': arg_count,
-                    'body': func_body
-                }
-                debug_print(f"Defined function: {func_name} with body: {func_body}")
-                return None, next_i
-        return None, next_i
+    # Execute function body with arguments
+    old_stack = call_stack.copy()
+    call_stack.clear()
+    call_stack.extend(args)
     
-    # Function call check
-    elif word in function_registry:
-        func_def = function_registry[word]
-        args = []
-        for i in range(func_def['arg_count']):
-            if next_i < len(plan_words):
-                arg_value, next_i = evaluate_word(plan_words, next_i)
-                args.append(arg_value)
-        
-        # Execute function body with arguments
-        old_stack = call_stack.copy()
-        call_stack.clear()
-        call_stack.extend(args)
-        
-        result = None
-        # Create a simple expression evaluator for function bodies
-        func_body_str = ' '.join(func_def['body'])
-        
-        # Replace arg references
-        for i in range(len(args)):
-            func_body_str = func_body_str.replace(f'arg {i+1}', str(args[i]))
-        
-        # Try to evaluate as expression
+    result = None
+    # Evaluate the compiled body with the arguments bound
+    func_code = func_def.get('code')
+    if func_code is not None:
         try:
-            result = eval(func_body_str)
-        except:
+            result = eval(func_code, function_body_globals, {'_args': args})
+        except Exception:
             # Fall back to simple parsing
-            result = func_body_str
-        
-        call_stack.clear()
-        call_stack.extend(old_stack)
-        return result, next_i
+            result = function_body_text(func_def, args)
+    else:
+        result = function_body_text(func_def, args)
     
-    # Enhanced conditionals with when operator
-    elif word == "when":
-        # Infix: value when condition
-        if current_i > 0:
-            prev_word = plan_words[current_i - 1]
-            if next_i < len(plan_words):
-                condition, next_i = evaluate_word(plan_words, next_i)
-                if condition:
-                    # Return the previous value
-                    try:
-                        if prev_word.replace('.', '').replace('-', '').isdigit():
-                            return eval(prev_word), next_i
-                        elif prev_word.startswith('"') and prev_word.endswith('"'):
-                            return prev_word[1:-1], next_i
-                        else:
-                            return prev_word, next_i
-                    except:
+    call_stack.clear()
+    call_stack.extend(old_stack)
+    return result, next_i
+
+# Enhanced conditionals with when operator
+def evaluate_when(plan_words, current_i, next_i):
+    # Infix: value when condition
+    if current_i > 0:
+        prev_word = plan_words[current_i - 1]
+        if next_i < len(plan_words):
+            condition, next_i = evaluate_word(plan_words, next_i)
+            if condition:
+                # Return the previous value
+                try:
+                    if prev_word.replace('.', '').replace('-', '').isdigit():
+                        return eval(prev_word), next_i
+                    elif prev_word.startswith('"') and prev_word.endswith('"'):
+                        return prev_word[1:-1], next_i
+                    else:
                         return prev_word, next_i
-                return None, next_i
-        return None, next_i
+                except:
+                    return prev_word, next_i
+            return None, next_i
+    return None, next_i
+
+# Array/List support: [item1, item2, ...]
+def evaluate_list(plan_words, current_i, next_i):
+    result = []
+    current_i = next_i
+    while current_i < len(plan_words) and plan_words[current_i] != "]":
+        item, current_i = evaluate_word(plan_words, current_i)
+        if item is not None:
+            result.append(item)
+    return result, current_i + 1 if current_i < len(plan_words) else current_i
+
+# Object/Dictionary support: {key1 value1 key2 value2}
+def evaluate_dict(plan_words, current_i, next_i):
+    result = {}
+    current_i = next_i
+    key = None
+    expecting_key = True
     
-    # Array/List support: [item1, item2, ...]
-    elif word == "[":
-        result = []
-        current_i = next_i
-        while current_i < len(plan_words) and plan_words[current_i] != "]":
-            item, current_i = evaluate_word(plan_words, current_i)
-            if item is not None:
-                result.append(item)
-        return result, current_i + 1 if current_i < len(plan_words) else current_i
+    while current_i < len(plan_words) and plan_words[current_i] != "}":
+        item, current_i = evaluate_word(plan_words, current_i)
+        if expecting_key:
+            key = item
+            expecting_key = False
+        else:
+            result[key] = item
+            expecting_key = True
     
-    # Object/Dictionary support: {key1 value1 key2 value2}
-    elif word == "{":
-        result = {}
-        current_i = next_i
-        key = None
-        expecting_key = True
-        
-        while current_i < len(plan_words) and plan_words[current_i] != "}":
-            item, current_i = evaluate_word(plan_words, current_i)
-            if expecting_key:
-                key = item
-                expecting_key = False
+    return result, current_i + 1 if current_i < len(plan_words) else current_i
+
+# Each loop support
+def evaluate_each(plan_words, current_i, next_i):
+    if next_i < len(plan_words):
+        iterable, next_i = evaluate_word(plan_words, next_i)
+        if next_i < len(plan_words) and plan_words[next_i] == "{":
+            returned = None
+            each_stack.append({'stop': False})
+            
+            if isinstance(iterable, dict):
+                items = iterable.items()
+            elif isinstance(iterable, list):
+                items = enumerate(iterable)
             else:
-                result[key] = item
-                expecting_key = True
-        
-        return result, current_i + 1 if current_i < len(plan_words) else current_i
-    
-    # Each loop support
-    elif word == "each":
-        if next_i < len(plan_words):
-            iterable, next_i = evaluate_word(plan_words, next_i)
-            if next_i < len(plan_words) and plan_words[next_i] == "{":
-                returned = None
-                each_stack.append({'stop': False})
-                
-                if isinstance(iterable, dict):
-                    items = iterable.items()
-                elif isinstance(iterable, list):
-                    items = enumerate(iterable)
-                else:
-                    each_stack.pop()
-                    return None, skip_block(plan_words, next_i)
-                
-                for key, value in items:
-                    if each_stack[-1]['stop']:
-                        break
-                    
-                    each_item_stack.append({'key': key, 'value': value})
-                    result, next_i = evaluate_block(plan_words, next_i)
-                    if result is not None:
-                        returned = result
-                    each_item_stack.pop()
-                
                 each_stack.pop()
-                return returned, next_i
-        return None, next_i
+                return None, skip_block(plan_words, next_i)
+            
+            for key, value in items:
+                if each_stack[-1]['stop']:
+                    break
+                if execution_budget is not None:
+                    execution_budget.step()
+                
+                each_item_stack.append({'key': key, 'value': value})
+                result, next_i = evaluate_block(plan_words, next_i)
+                if result is not None:
+                    returned = result
+                each_item_stack.pop()
+            
+            each_stack.pop()
+            return returned, next_i
+    return None, next_i
+
+# Each item access
+def evaluate_each_item(plan_words, current_i, next_i):
+    if each_item_stack:
+        return each_item_stack[-1]['value'], next_i
+    return None, next_i
+
+# Each key access
+def evaluate_each_key(plan_words, current_i, next_i):
+    if each_item_stack:
+        return each_item_stack[-1]['key'], next_i
+    return None, next_i
+
+# Each break
+def evaluate_each_break(plan_words, current_i, next_i):
+    if each_stack:
+        each_stack[-1]['stop'] = True
+    return None, next_i
+
+# Unless operator
+def evaluate_unless(plan_words, current_i, next_i):
+    if next_i < len(plan_words):
+        condition, next_i = evaluate_word(plan_words, next_i)
+        if next_i < len(plan_words) and plan_words[next_i] == "{":
+            if not condition:
+                result, next_i = evaluate_block(plan_words, next_i)
+                return result, next_i
+            else:
+                return None, skip_block(plan_words, next_i)
+    return None, next_i
+
+# Keywords checked before user functions
+keyword_handlers = {
+    'true': evaluate_true,
+    'false': evaluate_false,
+    'writeln': evaluate_writeln,
+    'write': evaluate_writeln,
+    'eval': evaluate_eval,
+    'if': evaluate_if,
+    'times': evaluate_times,
+    'times_count': evaluate_times_count,
+    'def': evaluate_def,
+}
+
+# Keywords checked after user functions, which can shadow them
+late_keyword_handlers = {
+    'when': evaluate_when,
+    '[': evaluate_list,
+    '{': evaluate_dict,
+    'each': evaluate_each,
+    'each_item': evaluate_each_item,
+    'each_key': evaluate_each_key,
+    'each_break': evaluate_each_break,
+    'unless': evaluate_unless,
+}
+
+def evaluate_word(plan_words, current_i):
+    if current_i >= len(plan_words):
+        return None, current_i
     
-    # Each item access
-    elif word == "each_item":
-        if each_item_stack:
-            return each_item_stack[-1]['value'], next_i
-        return None, next_i
+    word = plan_words[current_i]
+    debug_print("evaluating:", word)
+    next_i = current_i + 1
     
-    # Each key access
-    elif word == "each_key":
-        if each_item_stack:
-            return each_item_stack[-1]['key'], next_i
-        return None, next_i
+    # Keywords
+    handler = keyword_handlers.get(word)
+    if handler is not None:
+        return handler(plan_words, current_i, next_i)
     
-    # Each break
-    elif word == "each_break":
-        if each_stack:
-            each_stack[-1]['stop'] = True
-        return None, next_i
+    # Function call check
+    if word in function_registry:
+        return evaluate_function_call(plan_words, current_i, next_i)
     
-    # Unless operator
-    elif word == "unless":
-        if next_i < len(plan_words):
-            condition, next_i = evaluate_word(plan_words, next_i)
-            if next_i < len(plan_words) and plan_words[next_i] == "{":
-                if not condition:
-                    result, next_i = evaluate_block(plan_words, next_i)
-                    return result, next_i
-                else:
-                    return None, skip_block(plan_words, next_i)
-        return None, next_i
+    handler = late_keyword_handlers.get(word)
+    if handler is not None:
+        return handler(plan_words, current_i, next_i)
     
     # Postfix operators
-    elif current_i > 0 and word in postfix_operators:
+    if current_i > 0 and word in postfix_operators:
         prev_word = plan_words[current_i - 1]
         try:
             if prev_word.replace('.', '').replace('-', '').isdigit():
@@ -355,38 +463,59 @@ def evaluate_word(plan_words, current_i):
         return None, next_i
     
     # Infix operator check
-    elif current_i + 1 < len(plan_words) and plan_words[current_i + 1] in infix_operators:
+    if current_i + 1 < len(plan_words) and plan_words[current_i + 1] in infix_operators:
         result, next_i = handle_infix_operator(plan_words, current_i)
         if result is not None:
             return result, next_i
     
-    # Literals
+    # Literals, classified once by the parser
+    word_kinds = getattr(plan_words, 'word_kinds', None)
+    if word_kinds is not None:
+        word_kind = word_kinds[current_i]
+        word_value = plan_words.word_values[current_i]
+    else:
+        word_kind, word_value = classify_word(word)
+    if word_kind != WORD_OTHER:
+        return word_value, next_i
+    
+    # Try to parse as other literal
     try:
-        # Try to parse as number
-        if word.replace('.', '').replace('-', '').isdigit():
-            return eval(word), next_i
-        # Try to parse as string
-        elif word.startswith('"') and word.endswith('"'):
-            return word[1:-1], next_i
-        # Try to parse as other literal
-        else:
-            return eval(word), next_i
+        return eval(word), next_i
     except:
         # Unknown word
         debug_print(f"Unknown word: {word}")
         return word, next_i
 
-def evaluate_plan(plan_words):
-    """Main evaluation function"""
+def evaluate_plan(plan_words, budget=None):
+    """Main evaluation function
+    
+    With an ExecutionBudget, the plan is cut off by BudgetExceeded when it
+    runs past one of its limits.
+    """
+    global execution_budget, times_count
+    execution_budget = budget
+    if budget is not None:
+        budget.start(lambda: output_written)
+    
     current_i = 0
-    while current_i < len(plan_words):
-        try:
-            _, current_i = evaluate_word(plan_words, current_i)
-            if current_i is None:
+    try:
+        while current_i < len(plan_words):
+            try:
+                _, current_i = evaluate_word(plan_words, current_i)
+                if current_i is None:
+                    break
+            except BudgetExceeded:
+                # leave the loops and calls that were cut off
+                times_count = 0
+                call_stack.clear()
+                each_stack.clear()
+                each_item_stack.clear()
+                raise
+            except Exception as e:
+                debug_print(f"Evaluation error: {e}")
                 break
-        except Exception as e:
-            debug_print(f"Evaluation error: {e}")
-            break
+    finally:
+        execution_budget = None
 
 # Compatibility function for existing code
 def handle_print_with_conditionals(plan_words, start_i):
@@ -4,8 +4,9 @@ def extract_words_from_plan(plan):
     # split the plan into words
     plan_words = []
 
-    # split the plan into lines
-    for line in plan.split("\n"):
+    # split the plan into lines, unless it is already an iterable of lines
+    lines = plan.split("\n") if isinstance(plan, str) else plan
+    for line in lines:
 
         # remove leading and trailing whitespaces
         line = line.strip()
@@ -89,7 +90,83 @@ def join_string_words(plan_words):
     return joined_plan_words
 
 
+# opening and closing bracket words
+opening_brackets = frozenset(["{", "(", "["])
+closing_brackets = frozenset(["}", ")", "]"])
+
+
+# version of the parsing and classification of plans, for cached plans
+PARSE_VERSION = 2
+
+
+# kinds of the words of a plan
+WORD_NUMBER = 0
+WORD_STRING = 1
+WORD_OTHER = 2
+
+
+# classify a word of a plan, returning its kind and literal value
+def classify_word(word):
+
+    # numbers, including signed and decimal ones
+    if word.replace('.', '').replace('-', '').isdigit():
+        try:
+            return WORD_NUMBER, eval(word)
+        except Exception:
+            return WORD_OTHER, None
+
+    # quoted strings
+    if word.startswith('"') and word.endswith('"'):
+        return WORD_STRING, word[1:-1]
+
+    return WORD_OTHER, None
+
+
+# words of a plan, with a jump table of matching brackets
+class PlanWords(list):
+
+    def __init__(self, plan_words):
+        super().__init__(plan_words)
+        # index of the matching bracket of every bracket word, -1 otherwise
+        self.bracket_matches = match_brackets(self)
+        # kind and literal value of every word
+        classified_words = [classify_word(word) for word in self]
+        self.word_kinds = [kind for kind, _ in classified_words]
+        self.word_values = [value for _, value in classified_words]
+
+
+# rebuild the words of a plan saved with their jump table and classification
+def restore_plan_words(plan_words, bracket_matches, word_kinds, word_values):
+    restored = PlanWords.__new__(PlanWords)
+    list.__init__(restored, plan_words)
+    restored.bracket_matches = bracket_matches
+    restored.word_kinds = word_kinds
+    restored.word_values = word_values
+    return restored
+
+
+# match the brackets of the words of a plan
+def match_brackets(plan_words):
+
+    bracket_matches = [-1] * len(plan_words)
+
+    # indices of the brackets still open
+    open_brackets = []
+
+    for i, word in enumerate(plan_words):
+
+        # a closing bracket matches the last open bracket, of any type
+        if word in opening_brackets:
+            open_brackets.append(i)
+        elif word in closing_brackets and open_brackets:
+            opening_i = open_brackets.pop()
+            bracket_matches[opening_i] = i
+            bracket_matches[i] = opening_i
+
+    return bracket_matches
+
+
 def words_parse(plan_string):
     plan_words = extract_words_from_plan(plan_string)
     plan_words = join_string_words(plan_words)
-    return plan_words
+    return PlanWords(plan_words)
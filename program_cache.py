@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Program Cache for Pangea and Plan programs
+Parsed programs saved next to their source, like __pycache__
+
+A Pangea file is cached as the tokenized, classified and measured
+program of PangeaInterpreter.ingest_program, and a Plan file as its
+words with their bracket jump table and classification. Entries live in
+__pangea_cache__/ beside the source and are stored with the SHA-256 of
+the source bytes and the parser version, so an edited source or an
+upgraded interpreter falls back to parsing and rewrites the entry.
+"""
+
+import os
+import mmap
+import marshal
+import hashlib
+import tempfile
+import importlib.util
+from typing import Any, Dict, Optional
+
+from pangea_python_interpreter import PangeaInterpreter, INGEST_VERSION
+import plan_words_parsing
+from source_loading import mapped_lines
+
+
+CACHE_DIR = '__pangea_cache__'
+
+
+def source_digest(path: str, version: Any) -> str:
+    """SHA-256 of a file's bytes, the parser version and the marshal format"""
+    digest = hashlib.sha256()
+    digest.update(importlib.util.MAGIC_NUMBER)
+    digest.update(f"{version}\0".encode())
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        except (ValueError, OSError):
+            # Empty files and pipes cannot be mapped
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def cache_path(path: str, kind: str) -> str:
+    """Path of the cache entry of a source file"""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIR, f"{name}.{kind}.cache")
+
+
+def load_entry(path: str, kind: str, digest: str) -> Optional[Any]:
+    """Get the cached payload of a source file, None if missing or stale"""
+    try:
+        with open(cache_path(path, kind), 'rb') as f:
+            # marshal.load reads a file in small pieces, loads is far faster
+            stored_digest, payload = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return payload if stored_digest == digest else None
+
+
+def store_entry(path: str, kind: str, digest: str, payload: Any) -> bool:
+    """Save the payload of a source file, returning whether it was written
+
+    The entry is written to a temporary file and renamed into place, so
+    readers never see a partial entry. Unwritable directories are skipped.
+    """
+    entry_path = cache_path(path, kind)
+    try:
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix='.tmp')
+    except OSError:
+        return False
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(marshal.dumps((digest, payload)))
+        os.replace(temp_path, entry_path)
+    except (OSError, ValueError):
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def load_program(path: str, interpreter_class=PangeaInterpreter) -> Dict[str, Any]:
+    """Get the ingested form of a Pangea file, from the cache when current"""
+    digest = source_digest(path, INGEST_VERSION)
+    program = load_entry(path, 'pangea', digest)
+    if program is None:
+        program = interpreter_class.ingest_program(mapped_lines(path))
+        store_entry(path, 'pangea', digest, program)
+    return program
+
+
+def load_plan_words(path: str) -> plan_words_parsing.PlanWords:
+    """Get the parsed words of a Plan file, from the cache when current"""
+    digest = source_digest(path, plan_words_parsing.PARSE_VERSION)
+    saved = load_entry(path, 'plan', digest)
+    if saved is not None:
+        return plan_words_parsing.restore_plan_words(*saved)
+
+    plan_words = plan_words_parsing.words_parse(mapped_lines(path))
+    store_entry(path, 'plan', digest, (list(plan_words), plan_words.bracket_matches,
+                                       plan_words.word_kinds, plan_words.word_values))
+    return plan_words
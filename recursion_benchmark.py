@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Recursion Benchmark for the Pangea Python Interpreter
+Time per user function call and memory per recursion level, per engine
+"""
+
+import sys
+import time
+import tracemalloc
+
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer
+from pangea_vm import PangeaVM
+
+
+ENGINES = {'tree': PangeaInterpreter, 'vm': PangeaVM}
+
+FUNCTIONS = '''
+def fib#1
+if ( arg 1 ) < 2
+ arg 1
+ ( fib ( ( arg 1 ) - 1 ) ) + ( fib ( ( arg 1 ) - 2 ) )
+
+def sum_to#1
+if ( arg 1 ) == 0
+ 0
+ ( arg 1 ) + sum_to ( ( arg 1 ) - 1 )
+
+def countdown#1
+if ( arg 1 ) == 0
+ 0
+ countdown ( ( arg 1 ) - 1 )
+'''
+
+
+def fib_calls(n):
+    """Number of fib calls made to compute fib n"""
+    return 1 if n < 2 else 1 + fib_calls(n - 1) + fib_calls(n - 2)
+
+
+def new_interpreter(engine):
+    interpreter = ENGINES[engine](output=OutputBuffer(capture=True))
+    interpreter.exec(FUNCTIONS)
+    # Compile the functions before anything is measured
+    interpreter.exec('fib 3  sum_to 3  countdown 3')
+    return interpreter
+
+
+def time_per_call(engine, code, calls, repeats=5):
+    """Best time per call over several runs, in seconds"""
+    interpreter = new_interpreter(engine)
+    best = None
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        interpreter.exec(code)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best / calls
+
+
+def memory_per_level(engine, code, depth):
+    """Peak traced memory of a recursion, per level, in bytes"""
+    interpreter = new_interpreter(engine)
+    tracemalloc.start()
+    try:
+        interpreter.exec(code)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / depth
+
+
+def main():
+    """Run the recursion benchmark for every engine"""
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100000))
+    fib_n = 20
+    depth = 2000
+
+    print("🔁 PANGEA RECURSION BENCHMARK")
+    print("=" * 50)
+
+    for engine in ENGINES:
+        print(f"\n⚙️  Engine: {engine}")
+        per_call = time_per_call(engine, f'fib {fib_n}', fib_calls(fib_n))
+        print(f"    fib {fib_n}: {per_call * 1e6:.2f} µs/call")
+        per_call = time_per_call(engine, f'countdown {depth}', depth + 1)
+        print(f"    countdown {depth} (tail recursive): {per_call * 1e6:.2f} µs/call")
+        per_level = memory_per_level(engine, f'sum_to {depth}', depth)
+        print(f"    sum_to {depth}: {per_level:.0f} bytes/level peak")
+
+
+if __name__ == "__main__":
+    main()
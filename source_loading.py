@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Source Loading for Pangea and Plan programs
+Memory-mapped line reading and peak memory reporting
+
+mapped_lines hands a file to the tokenizers one decoded line at a time
+from a read-only memory map, so the full text of a large program is
+never held as a Python string.
+"""
+
+import sys
+import mmap
+from typing import Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _decode_line(raw_line: bytes, encoding: str) -> Iterator[str]:
+    """Decode a line as text mode does, one line per physical line
+    
+    CRLF and lone CR line endings become '\n', and a lone CR also ends
+    a line, so line numbers match those of an LF file.
+    """
+    line = raw_line.decode(encoding)
+    if '\r' in line:
+        *lines, last = line.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        for text in lines:
+            yield text + '\n'
+        if last:
+            yield last
+    else:
+        yield line
+
+
+def mapped_lines(path: str, encoding: str = 'utf-8') -> Iterator[str]:
+    """Yield the lines of a file, read through a memory map
+
+    Files that cannot be mapped (empty files, pipes) are read normally.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            for raw_line in f:
+                yield from _decode_line(raw_line, encoding)
+            return
+
+        with mapped:
+            for raw_line in iter(mapped.readline, b''):
+                yield from _decode_line(raw_line, encoding)
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes, None where unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
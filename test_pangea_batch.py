@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for batch execution through an interpreter pool
+"""
+
+from pangea_batch import run_batch, run_parallel, InterpreterPool, latency_summary
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer
+from pangea_vm import PangeaVM
+from test_pangea_vm import PROGRAMS
+from execution_budget import ExecutionBudget
+
+
+def run_fresh(interpreter_class, program):
+    interpreter = interpreter_class(output=OutputBuffer(capture=True))
+    return interpreter.exec(program), interpreter.output.getvalue()
+
+
+def test_reset():
+    """A reset interpreter behaves like a new one"""
+    print("=== Testing Reset ===")
+    for interpreter_class in (PangeaInterpreter, PangeaVM):
+        interpreter = interpreter_class(output=OutputBuffer(capture=True))
+        for program in PROGRAMS:
+            interpreter.exec('def print#1 "shadowed"  def f#0 1  print 7')
+            interpreter.reset()
+            assert interpreter.words == ["("]
+            assert (interpreter.exec(program), interpreter.output.getvalue()) == \
+                run_fresh(interpreter_class, program), program
+            interpreter.reset()
+
+
+def test_run_batch():
+    """Jobs are isolated and come back in order with their output"""
+    print("=== Testing Run Batch ===")
+    programs = [
+        'def double#1 ( arg 1 ) * 2  print double 4  double 5',
+        'print double 4',
+        '3 times print times_count 1',
+        'print "last"',
+    ]
+    for engine, interpreter_class in (('tree', PangeaInterpreter), ('vm', PangeaVM)):
+        expected = [run_fresh(interpreter_class, program) for program in programs]
+        assert expected[0] == (10, "8\n")
+        for workers in (1, 3):
+            results = run_batch(programs * 5, workers=workers, engine=engine)
+            assert [(r.result, r.output) for r in results] == expected * 5
+            assert all(r.error is None and r.seconds >= 0 for r in results)
+
+    summary = latency_summary(results)
+    assert summary['jobs'] == 20
+    assert summary['median'] <= summary['p95'] <= summary['max']
+
+
+def test_batch_pool_reuse():
+    """A shared pool keeps its interpreters across batches"""
+    pool = InterpreterPool()
+    run_batch(['print 1'], pool=pool)
+    with pool.interpreter() as first:
+        pass
+    run_batch(['print 2', 'def f#0 2'], pool=pool)
+    with pool.interpreter() as second:
+        assert second is first
+        assert second.namespace.get('f') is None
+
+    program = PangeaInterpreter.ingest_program('print 6 * 7')
+    assert run_batch([program, program], pool=pool)[1].output == "42\n"
+
+
+def test_batch_errors():
+    """A program that raises is reported without stopping the batch"""
+    results = run_batch([object(), 'print 1'])
+    assert results[0].error is not None and results[0].result is None
+    assert results[1].output == "1\n"
+
+
+def test_batch_budget():
+    """Runaway jobs are cut off in-process by their budget"""
+    budget = ExecutionBudget(max_steps=1000)
+    results = run_batch(['1000000000 times ( times_count 1 )', 'print 1'] * 3, workers=2, budget=budget)
+    assert [r.error for r in results[::2]] == ["BudgetExceeded: Step limit of 1000 exceeded"] * 3
+    assert [r.output for r in results[1::2]] == ["1\n"] * 3
+
+
+def test_run_parallel():
+    """Worker processes return the same results as an in-process batch"""
+    print("=== Testing Run Parallel ===")
+    programs = PROGRAMS * 3
+    for engine, interpreter_class in (('tree', PangeaInterpreter), ('vm', PangeaVM)):
+        expected = [(r.result, r.output) for r in run_batch(programs, engine=engine)]
+        ingested = [interpreter_class.ingest_program(program) for program in programs]
+        results = run_parallel(ingested, jobs=2, engine=engine)
+        assert [(r.result, r.output) for r in results] == expected
+    
+    # Interpreter options reach the workers
+    results = run_parallel(['print 1'], jobs=1, trace=True)
+    assert results[0].output.startswith("Executing: print 1\n")
+
+
+def main():
+    test_reset()
+    test_run_batch()
+    test_batch_pool_reuse()
+    test_batch_errors()
+    test_batch_budget()
+    test_run_parallel()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,11 @@
 Test script for the Pangea Python Interpreter
 """
 
-from pangea_python_interpreter import PangeaInterpreter
+import io
+
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer, tokenize
+from pangea_python_interpreter import WORD_LITERAL, WORD_OPEN, WORD_CLOSE, WORD_DEFINITION, WORD_IDENTIFIER
+from execution_budget import ExecutionBudget, BudgetExceeded
 
 
 def test_basic_operations():
@@ -107,6 +111,335 @@ def test_complex_example():
     ''')
 
 
+def test_compiled_execution():
+    """Test that compiled phrases follow definitions made while running"""
+    print("\n=== Testing Compiled Execution ===")
+    interpreter = PangeaInterpreter()
+    
+    # The block is compiled before either definition of scale runs
+    result = interpreter.exec('''
+    (
+        def scale#1 ( arg 1 ) * 2
+        def first#0 scale 5
+        def scale#1 ( arg 1 ) * 3
+        first
+    )
+    ''')
+    assert result == 15
+    
+    # Loop bodies are compiled once and reused on every iteration
+    interpreter.exec('def double#1 ( arg 1 ) * 2')
+    assert interpreter.exec('4 times double times_count 1') == 8
+    assert interpreter.exec('print [ 1 ( 2 + 3 ) { "k" 4 squared } ]') == [1, 5, {"k": 16}]
+
+
+def test_incremental_exec():
+    """Test that repeated exec calls only measure their own words"""
+    print("\n=== Testing Incremental Exec ===")
+    interpreter = PangeaInterpreter()
+    
+    interpreter.exec('def inc#1 ( arg 1 ) + 1')
+    measured = list(interpreter.phrase_lengths)
+    
+    for i in range(50):
+        assert interpreter.exec(f'inc {i}') == i + 1
+    
+    assert interpreter.phrase_lengths[:len(measured)] == measured
+    assert len(interpreter.phrase_lengths) == len(interpreter.words)
+
+
+def test_output_buffer():
+    """Test quiet execution into a captured output buffer"""
+    print("\n=== Testing Output Buffer ===")
+    output = OutputBuffer(capture=True)
+    interpreter = PangeaInterpreter(output=output)
+    
+    interpreter.exec('3 times print times_count 1')
+    interpreter.exec('print [ 1 2 ]')
+    assert output.getvalue() == "1\n2\n3\n[1, 2]\n"
+    
+    output.clear()
+    interpreter.trace = True
+    interpreter.exec('print "traced"')
+    assert output.getvalue().splitlines() == [
+        'Executing: print "traced"',
+        "Words: ['print', '\"traced\"']",
+        "Phrase lengths: [2, 1]",
+        "[begin]",
+        "traced",
+        "[end]",
+    ]
+
+
+def test_word_classification():
+    """Test the per-word kind and literal value tables"""
+    print("\n=== Testing Word Classification ===")
+    interpreter = PangeaInterpreter()
+    
+    interpreter.exec('def f#1 ( arg 1 ) == "x" print [ 1.5 true null ]')
+    assert len(interpreter.word_kinds) == len(interpreter.words)
+    assert len(interpreter.word_values) == len(interpreter.words)
+    
+    classes = dict(zip(interpreter.words, zip(interpreter.word_kinds, interpreter.word_values)))
+    assert classes['f#1'] == (WORD_DEFINITION, None)
+    assert classes['arg'] == (WORD_IDENTIFIER, None)
+    assert classes['('] == (WORD_OPEN, None)
+    assert classes[']'] == (WORD_CLOSE, None)
+    assert classes['"x"'] == (WORD_LITERAL, "x")
+    assert classes['1.5'] == (WORD_LITERAL, 1.5)
+    assert classes['null'] == (WORD_LITERAL, None)
+    assert interpreter.exec('print [ 1.5 true null ]') == [1.5, True, None]
+
+
+def test_operand_lengths():
+    """Test that operand-only phrase lengths are measured at ingestion"""
+    print("\n=== Testing Operand Lengths ===")
+    interpreter = PangeaInterpreter()
+    
+    interpreter.exec('print ( 1 + 2 ) squared')
+    # Words: ( print ( 1 + 2 ) squared
+    assert interpreter.phrase_lengths[1:] == [7, 6, 3, 2, 1, 1, 1]
+    assert interpreter.operand_lengths[1:] == [7, 5, 1, 2, 1, 1, 1]
+    assert interpreter.exec('print ( 1 + 2 ) squared') == 9
+
+
+def test_constant_folding():
+    """Test that operators over literals are folded at compile time"""
+    print("\n=== Testing Constant Folding ===")
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True))
+    
+    assert interpreter.exec('( 42 + 13 ) * ( 7 - 3 )') == 220
+    # Words: ( ( 42 + 13 ) * ( 7 - 3 )
+    node = interpreter._compiled[1]
+    assert interpreter._constants[node] == 220
+    
+    assert interpreter.exec('2 ** 3') == 8
+    assert interpreter.exec('( 3 squared ) > 8') is True
+    
+    # Operands that are not literals are left alone
+    interpreter.exec('def double#1 ( arg 1 ) * 2')
+    assert interpreter.exec('double 21') == 42
+    assert interpreter.exec('3 times ( times_count 1 ) + 1') == 4
+    
+    # Errors still happen when the expression runs
+    interpreter.exec('print "never" unless true')
+    try:
+        interpreter.exec('1 % 0')
+        assert False, "expected ZeroDivisionError"
+    except ZeroDivisionError:
+        pass
+
+
+def test_memoization():
+    """Test def_pure and automatic memoization of pure functions"""
+    print("\n=== Testing Memoization ===")
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True))
+    interpreter.exec('''
+    def_pure fib#1
+    if ( arg 1 ) < 2
+     arg 1
+     ( fib ( ( arg 1 ) - 1 ) ) + ( fib ( ( arg 1 ) - 2 ) )
+    ''')
+    assert interpreter.exec('fib 80') == 23416728348467685
+    assert interpreter.namespace['fib']['memo'][((int, 80),)] == 23416728348467685
+    
+    # The cache is bounded and evicts the least recently used results
+    interpreter.memo_size = 2
+    interpreter.exec('def_pure double#1 ( arg 1 ) * 2')
+    memo = interpreter.namespace['double']['memo']
+    interpreter.exec('double 1  double 2  double 1  double 3')
+    assert list(memo) == [((int, 1),), ((int, 3),)]
+    
+    # Unhashable arguments are not cached
+    assert interpreter.exec('double [ 1 ]') == [1, 1]
+    assert len(memo) == 2
+    
+    # Only pure functions are memoized automatically
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True), auto_memoize=True)
+    interpreter.exec('''
+    def triple#1 ( arg 1 ) * 3
+    def shout#1 print arg 1
+    def count#0 times_count 1
+    def six#1 triple triple arg 1
+    ''')
+    assert interpreter.namespace['triple'].get('pure')
+    assert interpreter.namespace['six'].get('pure')
+    assert not interpreter.namespace['shout'].get('pure')
+    assert not interpreter.namespace['count'].get('pure')
+    assert interpreter.exec('six 2') == 18
+    
+    # Redefining a callee drops results that depended on it
+    interpreter.exec('def triple#1 ( arg 1 ) * 4')
+    assert interpreter.exec('six 2') == 32
+    
+    # Redefining a callee as impure unmemoizes its callers
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True), auto_memoize=True)
+    interpreter.exec('def t#1 ( arg 1 ) * 3  def six#1 t arg 1')
+    assert interpreter.namespace['six'].get('pure')
+    interpreter.exec('def t#1 print arg 1')
+    assert not interpreter.namespace['six'].get('pure')
+    for _ in range(3):
+        interpreter.exec('six 2')
+    assert interpreter.output.getvalue() == "2\n" * 3
+    
+    # Memoized functions keep their tail calls
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True), auto_memoize=True)
+    interpreter.exec('''
+    def deep_recursion#1
+    if ( arg 1 ) == 0
+     "bottom"
+     deep_recursion ( ( arg 1 ) - 1 )
+    def_pure c#1 "done" when ( arg 1 ) == 0 c ( ( arg 1 ) - 1 )
+    ''')
+    assert interpreter.namespace['deep_recursion'].get('pure')
+    assert interpreter.exec('deep_recursion 100000') == "bottom"
+    assert interpreter.exec('c 5000') == "done"
+    assert interpreter.namespace['c']['memo'][((int, 0),)] == "done"
+    assert len(interpreter.namespace['stack']) == 1
+
+
+def test_tail_calls():
+    """Test that calls in tail position run in constant Python stack"""
+    print("\n=== Testing Tail Calls ===")
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True))
+    interpreter.exec('''
+    def deep_recursion#1
+    if ( arg 1 ) == 0
+     "bottom"
+     deep_recursion ( ( arg 1 ) - 1 )
+    def even#1 ( if ( arg 1 ) == 0 true odd ( ( arg 1 ) - 1 ) )
+    def odd#1 ( if ( arg 1 ) == 0 false even ( ( arg 1 ) - 1 ) )
+    def down#1 "done" when ( arg 1 ) == 0 down ( ( arg 1 ) - 1 )
+    ''')
+    assert interpreter.exec('deep_recursion 100000') == "bottom"
+    assert interpreter.exec('even 20001') is False
+    assert interpreter.exec('down 20000') == "done"
+    assert len(interpreter.namespace['stack']) == 1
+    
+    # Calls that are not in tail position still return to their caller
+    interpreter.exec('''
+    def sum_to#1
+    if ( arg 1 ) == 0
+     0
+     ( arg 1 ) + sum_to ( ( arg 1 ) - 1 )
+    ''')
+    assert interpreter.exec('sum_to 100') == 5050
+
+
+def test_lazy_arguments():
+    """Test that lazy arguments are evaluated on first use, at most once"""
+    print("\n=== Testing Lazy Arguments ===")
+    output = OutputBuffer(capture=True)
+    interpreter = PangeaInterpreter(output=output, lazy_args=True)
+    interpreter.exec('''
+    def first#2 arg 1
+    def twice#1 ( arg 1 ) + ( arg 1 )
+    def show#1 ( 2 times ( print arg 1 ) )
+    ''')
+    
+    # Unused arguments are never evaluated
+    assert interpreter.exec('first 1 ( print "side" )') == 1
+    assert output.getvalue() == ""
+    
+    # Used arguments are evaluated once
+    assert interpreter.exec('twice ( print 5 )') == 10
+    assert output.getvalue() == "5\n"
+    
+    # Arguments see the loop counters and items of their caller
+    output.clear()
+    interpreter.exec('2 times ( show times_count 1 )')
+    assert output.getvalue() == "1\n1\n2\n2\n"
+    assert interpreter.exec('[ 7 8 ] each ( first each_item 0 )') == 8
+    assert len(interpreter.namespace['stack']) == 1
+    
+    # Tail calls defer their arguments too, which read the caller's arguments
+    output.clear()
+    interpreter.exec('''
+    def wrap#0 first 1 ( print "side" )
+    def pass#1 first ( arg 1 ) 0
+    def down#1 "done" when ( arg 1 ) == 0 down ( ( arg 1 ) - 1 )
+    ''')
+    assert interpreter.exec('wrap') == 1
+    assert output.getvalue() == ""
+    assert interpreter.exec('pass 5') == 5
+    assert interpreter.exec('down 20000') == "done"
+    assert len(interpreter.namespace['stack']) == 1
+
+
+def test_times_loops():
+    """Test times loop counters and loops with nothing to run"""
+    print("\n=== Testing Times Loops ===")
+    output = OutputBuffer(capture=True)
+    interpreter = PangeaInterpreter(output=output)
+    
+    interpreter.exec('2 times ( 2 times ( print [ ( times_count 2 ) ( times_count 1 ) ] ) )')
+    assert output.getvalue() == "[1, 1]\n[1, 2]\n[2, 1]\n[2, 2]\n"
+    assert interpreter.namespace['times_stack'] == []
+    
+    # Empty bodies finish without iterating
+    assert interpreter.exec('1000000000 times pass') is None
+    assert interpreter.exec('1000000000 times ( )') is None
+    assert interpreter.exec('3 times 7') == 7
+    assert interpreter.exec('0 times 7') is None
+
+
+def test_tokenizer():
+    """Test token positions, string decoding and stream input"""
+    print("\n=== Testing Tokenizer ===")
+    source = '# comment\nprint "a+b"\n  [ 1 2 ]\n'
+    tokens = list(tokenize(source))
+    assert [(t.word, t.line, t.column) for t in tokens] == [
+        ('print', 2, 1), ('"a b"', 2, 7), ('[', 3, 3), ('1', 3, 5), ('2', 3, 7), (']', 3, 9)]
+    assert tokens[1].string == "a b"
+    assert tokens[0].string is None
+    
+    # A string left open continues on the next line
+    tokens = list(tokenize('print "one\n  two(+)"'))
+    assert [t.word for t in tokens] == ['print', '"one two+"']
+    assert (tokens[1].line, tokens[1].column) == (1, 7)
+    
+    # Streams are read a line at a time
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True))
+    assert interpreter.parse_code(io.StringIO('print "x"\n3 squared')) == ['print', '"x"', '3', 'squared']
+    assert interpreter.exec('"caf\u00e9+(+)"') == "caf\u00e9 +"
+
+
+def exceeded_limit(interpreter, code):
+    """The limit code runs past, None if it finishes"""
+    try:
+        interpreter.exec(code)
+    except BudgetExceeded as e:
+        return e.limit
+    return None
+
+
+def test_execution_budget():
+    """Test that runs are cut off at their limits and leave clean stacks"""
+    print("\n=== Testing Execution Budget ===")
+    budget = ExecutionBudget(max_steps=100, max_depth=50)
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True), budget=budget)
+    interpreter.exec('def down#1 if ( arg 1 ) == 0 0 1 + down ( ( arg 1 ) - 1 )')
+    interpreter.exec('def spin#1 if ( arg 1 ) == 0 0 spin ( ( arg 1 ) - 1 )')
+    
+    # The budget is reset for every exec call and steps are exact
+    assert interpreter.exec('100 times ( times_count 1 )') == 100
+    assert interpreter.exec('down 49') == 49
+    assert exceeded_limit(interpreter, '101 times ( times_count 1 )') == 'steps'
+    assert budget.steps == 101
+    assert exceeded_limit(interpreter, '[ 1 2 ] each ( 60 times ( times_count 1 ) )') == 'steps'
+    assert exceeded_limit(interpreter, 'down 51') == 'depth'
+    assert exceeded_limit(interpreter, 'spin 1000') == 'steps'
+    stacks = interpreter.namespace
+    assert (len(stacks['stack']), stacks['times_stack'], stacks['each_stack']) == (1, [], [])
+    
+    interpreter.budget = ExecutionBudget(max_seconds=0.01)
+    assert exceeded_limit(interpreter, '1000000000 times ( times_count 1 )') == 'seconds'
+    interpreter.budget = ExecutionBudget(max_output=50, check_every=10)
+    assert exceeded_limit(interpreter, '1000 times print "line"') == 'output'
+    interpreter.budget = None
+    assert interpreter.exec('down 100') == 100
+
+
 def interactive_mode():
     """Interactive REPL mode"""
     print("\n=== Interactive Mode ===")
@@ -135,6 +468,18 @@ def main():
     test_data_structures()
     test_functions()
     test_complex_example()
+    test_compiled_execution()
+    test_incremental_exec()
+    test_output_buffer()
+    test_word_classification()
+    test_operand_lengths()
+    test_constant_folding()
+    test_memoization()
+    test_tail_calls()
+    test_lazy_arguments()
+    test_times_loops()
+    test_tokenizer()
+    test_execution_budget()
     
     # Uncomment the next line to run interactive mode
     # interactive_mode()
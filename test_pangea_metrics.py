@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for Pangea metrics
+"""
+
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer
+from pangea_vm import PangeaVM
+from pangea_metrics import Metrics
+
+
+FIB = '''
+def fib#1
+if ( arg 1 ) < 2
+ arg 1
+ ( fib ( ( arg 1 ) - 1 ) ) + ( fib ( ( arg 1 ) - 2 ) )
+'''
+
+
+def metered(interpreter_class=PangeaInterpreter):
+    metrics = Metrics()
+    interpreter = interpreter_class(output=OutputBuffer(capture=True), metrics=metrics)
+    return interpreter, metrics
+
+
+def test_call_counts():
+    """Built-ins and user functions are counted per call"""
+    print("=== Testing Call Counts ===")
+    interpreter, metrics = metered()
+    interpreter.exec(FIB + 'print fib 5\n3 times print "x"')
+    counts = metrics.snapshot()
+    assert counts['function.fib'] == 15
+    assert counts['builtin.if'] == 15
+    assert counts['builtin.print'] == 4
+    assert counts['builtin.times'] == 1
+    assert counts['builtin.+'] == 7 and counts['builtin.<'] == 15
+    assert counts['executions'] == 1
+    # Identifiers are not JSON, and phrase lengths are reused once measured
+    assert counts['json_failures'] > 0
+    assert counts['phrase_length.hits'] > 0 and counts['phrase_length.misses'] > 0
+
+
+def test_listeners():
+    """Listeners get the counts of each execution"""
+    print("=== Testing Listeners ===")
+    interpreter, metrics = metered()
+    deltas = []
+    metrics.add_listener(deltas.append)
+    metrics.add_listener(lambda delta: 1 / 0)
+    interpreter.exec(FIB + 'print fib 5')
+    interpreter.exec('print fib 3')
+    assert interpreter.output.getvalue() == "5\n2\n"
+    assert len(deltas) == 2
+    assert deltas[0]['function.fib'] == 15
+    assert deltas[1]['function.fib'] == 5 and deltas[1]['executions'] == 1
+    assert 'builtin.def' not in deltas[1]
+    assert metrics.listener_errors == 2
+
+    # Executions cut off by an error are published too
+    try:
+        interpreter.exec('print 1 / 0')
+    except ZeroDivisionError:
+        pass
+    assert len(deltas) == 3 and metrics.snapshot()['executions'] == 3
+
+
+def test_vm_opcodes():
+    """PangeaVM counts instructions per opcode and user function calls"""
+    print("=== Testing VM Opcodes ===")
+    interpreter, metrics = metered(PangeaVM)
+    interpreter.exec(FIB + 'print fib 5')
+    counts = metrics.snapshot()
+    assert interpreter.output.getvalue() == "5\n"
+    assert counts['function.fib'] == 15
+    assert counts['opcode.CALL'] == 15 and counts['opcode.RETURN'] == 15
+    assert counts['opcode.PRINT'] == 1
+    assert counts['executions'] == 1
+
+
+def test_metrics_disabled():
+    """Metrics leave output unchanged and keep counting after a reset"""
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True))
+    interpreter.exec(FIB + 'fib 6')
+    assert interpreter.metrics is None
+
+    metered_interpreter, metrics = metered()
+    metered_interpreter.exec(FIB + 'fib 6')
+    assert metered_interpreter.output.getvalue() == interpreter.output.getvalue()
+    metrics.reset()
+    assert metrics.snapshot() == {}
+    metered_interpreter.exec('fib 6')
+    assert metrics.snapshot()['function.fib'] == 25
+
+
+def main():
+    test_call_counts()
+    test_listeners()
+    test_vm_opcodes()
+    test_metrics_disabled()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the Pangea profiler
+"""
+
+import io
+import itertools
+
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer
+from pangea_profiler import Profiler
+
+
+FIB = '''
+def fib#1
+if ( arg 1 ) < 2
+ arg 1
+ ( fib ( ( arg 1 ) - 1 ) ) + ( fib ( ( arg 1 ) - 2 ) )
+'''
+
+
+def profiled_run(code, profiler):
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True), profiler=profiler)
+    result = interpreter.exec(code)
+    return interpreter, result
+
+
+def test_profile_counts():
+    """Calls are counted per word and recursion is timed once"""
+    print("=== Testing Profile Counts ===")
+    # A clock that advances one unit per reading
+    profiler = Profiler(clock=itertools.count().__next__)
+    interpreter, result = profiled_run(FIB + 'print fib 5', profiler)
+    assert result == 5
+    assert interpreter.output.getvalue() == "5\n"
+
+    calls = {word: stats[0] for word, stats in profiler.words.items()}
+    assert calls['fib'] == 15
+    assert calls['print'] == 1 and calls['def'] == 1
+    assert '+' in calls and '<' in calls
+
+    # Own times add up to the total, and the outermost print covers all of fib
+    fib_calls, fib_total, fib_own = profiler.words['fib']
+    print_total = profiler.words['print'][1]
+    assert sum(stats[2] for stats in profiler.words.values()) == profiler.total()
+    assert fib_own < fib_total < print_total
+
+    report = profiler.report(interpreter)
+    assert "fib#1 (function)" in report
+    assert "print fib 5" in report
+
+
+def test_collapsed_stacks():
+    """Collapsed stacks nest calls and stay bounded under deep recursion"""
+    print("=== Testing Collapsed Stacks ===")
+    profiler = Profiler(clock=itertools.count().__next__, max_stack_depth=10)
+    profiled_run(FIB + 'print fib 6', profiler)
+    lines = profiler.collapsed_stacks()
+    stacks = [line.rsplit(' ', 1)[0] for line in lines]
+    assert 'print;fib;if' in stacks
+    assert all(int(line.rsplit(' ', 1)[1]) > 0 for line in lines)
+    assert max(stack.count(';') for stack in stacks) <= 10
+
+    output = io.StringIO()
+    profiler.write_collapsed(output)
+    assert output.getvalue().splitlines() == lines
+
+
+def test_profiler_disabled():
+    """Without a profiler no compiled call is wrapped"""
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True))
+    interpreter.exec(FIB + 'fib 6')
+    assert all(node.__name__ != 'profiled' for node in interpreter._compiled.values())
+
+    profiled, _ = profiled_run(FIB + 'fib 6', Profiler())
+    assert any(node.__name__ == 'profiled' for node in profiled._compiled.values())
+
+
+def main():
+    test_profile_counts()
+    test_collapsed_stacks()
+    test_profiler_disabled()
+
+
+if __name__ == "__main__":
+    main()
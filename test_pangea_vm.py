@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Test script for the Pangea bytecode VM
+"""
+
+import io
+import asyncio
+import contextlib
+
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer, AsyncOutputBuffer
+from pangea_vm import PangeaVM, CodeObject, PUSH_CONST
+from execution_budget import ExecutionBudget, BudgetExceeded
+
+
+PROGRAMS = [
+    'print 2 + 3 * 4',
+    'if false print "no" print "yes"',
+    '3 times ( print times_count 1 )',
+    'print times_count print 1',
+    'print [ 1 ( 2 + 3 ) { "k" 4 squared } ]',
+    '{ "a" 1 "b" 2 } each ( print each_key print each_item )',
+    '[ 1 2 3 4 ] each ( print each_item each_break )',
+    '''
+    def multiple#2
+    0 == ( ( arg 1 ) % ( arg 2 ) )
+    def i#0
+    times_count 1
+    15 times print (
+        "fizz-buzz" when multiple i 15
+        "fizz" when multiple i 3
+        "buzz" when multiple i 5
+        i
+    )
+    ''',
+    '''
+    def fib#1
+    if ( arg 1 ) < 2
+     arg 1
+     ( fib ( ( arg 1 ) - 1 ) ) + ( fib ( ( arg 1 ) - 2 ) )
+    print fib 12
+    ''',
+    '''
+    def_pure fib#1
+    if ( arg 1 ) < 2
+     arg 1
+     ( fib ( ( arg 1 ) - 1 ) ) + ( fib ( ( arg 1 ) - 2 ) )
+    print fib 40
+    ''',
+    'print "a" unless false',
+    '2 times ( 2 times ( print [ ( times_count 2 ) ( times_count 1 ) ] ) )',
+    'print 1000000000 times pass',
+    'undefined_word 1',
+]
+
+
+def run_captured(interpreter_class, code):
+    """Run code on a fresh interpreter, returning its result and output"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = interpreter_class().exec(code)
+    return result, output.getvalue()
+
+
+def test_vm_matches_tree_walker():
+    """Test that both engines produce the same results and output"""
+    print("=== Testing VM Against Tree Walker ===")
+    for code in PROGRAMS:
+        assert run_captured(PangeaVM, code) == run_captured(PangeaInterpreter, code), code
+
+
+def test_vm_deep_recursion():
+    """Test recursion far beyond the Python recursion limit"""
+    print("\n=== Testing VM Deep Recursion ===")
+    vm = PangeaVM()
+    vm.exec('''
+    def deep_recursion#1
+    if ( arg 1 ) == 0
+     "bottom"
+     deep_recursion ( ( arg 1 ) - 1 )
+    ''')
+    assert vm.exec('deep_recursion 20000') == "bottom"
+    assert len(vm.namespace['stack']) == 1
+
+
+def test_vm_constant_folding():
+    """Test that operators over literals are lowered to one constant"""
+    print("\n=== Testing VM Constant Folding ===")
+    vm = PangeaVM()
+    assert vm.exec('( 42 + 13 ) * ( 7 - 3 )') == 220
+    # Words: ( ( 42 + 13 ) * ( 7 - 3 )
+    code = CodeObject("<test>")
+    vm._lower(code, 1)
+    assert code.instructions == [(PUSH_CONST, 220)]
+    assert vm.exec('( 3 squared ) > 8') is True
+    assert vm.exec('2 ** 3') == 8
+
+
+def test_vm_nested_loops():
+    """Test that nested loops lower each body once"""
+    print("\n=== Testing VM Nested Loops ===")
+    depth = 20
+    code = '1 times ( ' * depth + 'print 1' + ' )' * depth
+    vm = PangeaVM()
+    lower = vm._lower
+    lowered = []
+
+    def counting_lower(*args, **kwargs):
+        lowered.append(args[1])
+        return lower(*args, **kwargs)
+    vm._lower = counting_lower
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        vm.exec(code)
+    assert output.getvalue() == "1\n"
+    # A handful of lowerings per loop, not 2^depth
+    assert len(lowered) < 4 * depth
+    assert run_captured(PangeaVM, '2 times ( 3 times ( 5 ) )') == (5, "")
+
+
+def test_vm_exec_async():
+    """Test that async execution matches exec and shares the event loop"""
+    print("\n=== Testing VM Async Execution ===")
+    
+    async def run_async(code):
+        vm = PangeaVM(output=OutputBuffer(capture=True))
+        return await vm.exec_async(code, pause_every=7), vm.output.getvalue()
+    
+    for code in PROGRAMS:
+        vm = PangeaVM(output=OutputBuffer(capture=True))
+        assert asyncio.run(run_async(code)) == (vm.exec(code), vm.output.getvalue()), code
+    
+    async def interleaved():
+        sent = []
+        
+        async def run_tagged(tag):
+            async def send(text):
+                sent.append((tag, text))
+            vm = PangeaVM(output=AsyncOutputBuffer(send))
+            return await vm.exec_async('50 times print times_count 1', pause_every=10)
+        
+        results = await asyncio.gather(run_tagged('a'), run_tagged('b'))
+        return results, sent
+    
+    results, sent = asyncio.run(interleaved())
+    assert results == [50, 50]
+    tags = [tag for tag, _ in sent]
+    assert tags.index('b') < len(tags) - 1 - tags[::-1].index('a')
+    for tag in 'ab':
+        text = ''.join(chunk for chunk_tag, chunk in sent if chunk_tag == tag)
+        assert text == ''.join(f"{i}\n" for i in range(1, 51))
+    
+    # Plain exec cannot await the flush, so it refuses async output
+    async def send(text):
+        pass
+    for interpreter_class in (PangeaInterpreter, PangeaVM):
+        try:
+            interpreter_class(output=AsyncOutputBuffer(send)).exec('print 1')
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("exec accepted an AsyncOutputBuffer")
+
+
+def test_vm_exec_async_stops():
+    """Test timeouts and cancellation of async execution"""
+    print("\n=== Testing VM Async Timeout and Cancellation ===")
+    vm = PangeaVM(output=OutputBuffer(capture=True))
+    vm.exec('def spin#1 ( arg 1 ) times ( times_count 1 )')
+    
+    async def timed_out():
+        try:
+            await vm.exec_async('spin 1000000000', timeout=0.05)
+        except asyncio.TimeoutError:
+            return True
+        return False
+    assert asyncio.run(timed_out())
+    assert len(vm.namespace['stack']) == 1 and vm.namespace['times_stack'] == []
+    
+    async def cancelled():
+        task = asyncio.ensure_future(vm.exec_async('spin 1000000000'))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+    assert asyncio.run(cancelled())
+    assert len(vm.namespace['stack']) == 1 and vm.namespace['times_stack'] == []
+    assert vm.exec('spin 3') == 3
+
+
+def test_vm_execution_budget():
+    """Test that the VM counts steps and depth like the tree walker"""
+    print("\n=== Testing VM Execution Budget ===")
+    programs = [
+        '12 times ( times_count 1 )',
+        '[ 1 2 3 4 5 6 7 8 9 10 11 12 ] each ( each_item )',
+        'def down#1 if ( arg 1 ) == 0 0 1 + down ( ( arg 1 ) - 1 )  down 7',
+    ]
+    for code in programs:
+        limits = []
+        for interpreter_class in (PangeaInterpreter, PangeaVM):
+            budget = ExecutionBudget(max_steps=10, max_depth=5, check_every=3)
+            interpreter = interpreter_class(output=OutputBuffer(capture=True), budget=budget)
+            try:
+                interpreter.exec(code)
+            except BudgetExceeded as e:
+                limits.append((e.limit, budget.steps))
+            assert len(interpreter.namespace['stack']) == 1
+        assert limits[0] == limits[1] and len(limits) == 2, (code, limits)
+    
+    # Tail calls reuse their frame on the tree walker only, so tail
+    # recursion passes max_depth there and not on the VM
+    code = 'def spin#1 if ( arg 1 ) == 0 "done" spin ( ( arg 1 ) - 1 )  spin 70'
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True),
+                                    budget=ExecutionBudget(max_depth=50))
+    assert interpreter.exec(code) == "done"
+    vm = PangeaVM(output=OutputBuffer(capture=True), budget=ExecutionBudget(max_depth=50))
+    try:
+        vm.exec(code)
+        assert False, "max_depth not enforced"
+    except BudgetExceeded as e:
+        assert e.limit == 'depth'
+    assert len(vm.namespace['stack']) == 1
+
+
+def main():
+    """Main test function"""
+    test_vm_matches_tree_walker()
+    test_vm_deep_recursion()
+    test_vm_constant_folding()
+    test_vm_nested_loops()
+    test_vm_exec_async()
+    test_vm_exec_async_stops()
+    test_vm_execution_budget()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for the Plan word parser and evaluator
+"""
+
+from plan_words_parsing import words_parse, WORD_NUMBER, WORD_STRING, WORD_OTHER
+import plan_words_evaluation
+from plan_words_evaluation import skip_block, evaluate_plan, function_registry
+from execution_budget import ExecutionBudget, BudgetExceeded
+
+
+def test_bracket_matches():
+    """Every bracket word knows the index of its partner"""
+    plan_words = words_parse('if true { writeln ( 1 + [ 2 ] ) } writeln "x"')
+    matches = plan_words.bracket_matches
+
+    assert len(matches) == len(plan_words)
+    for i, word in enumerate(plan_words):
+        if word in ("{", "(", "[", "}", ")", "]"):
+            assert matches[matches[i]] == i, (i, word)
+        else:
+            assert matches[i] == -1, (i, word)
+
+    opening_i = plan_words.index("{")
+    assert plan_words[matches[opening_i]] == "}"
+
+    # An unmatched opener has no partner
+    assert words_parse('{ writeln 1').bracket_matches[0] == -1
+    print("✅ bracket matches")
+
+
+def test_skip_block():
+    """skip_block agrees with a plain word scan"""
+    source = 'if false { times 2 { writeln ( 1 + 2 ) } } writeln "done"'
+    plan_words = words_parse(source)
+    plain_words = list(plan_words)
+
+    for i, word in enumerate(plan_words):
+        assert skip_block(plan_words, i) == skip_block(plain_words, i), (i, word)
+
+    opening_i = plan_words.index("{")
+    assert plan_words[skip_block(plan_words, opening_i)] == "writeln"
+    print("✅ skip_block")
+
+
+def test_compiled_function_body():
+    """Function bodies are compiled once and bind their arguments"""
+    function_registry.clear()
+    evaluate_plan(words_parse('def add#2 arg 1 + arg 2 def greet#1 "Hello, " + arg 1'))
+    assert function_registry['add']['code'] is not None
+
+    def fail_compile(*args):
+        raise AssertionError("function body compiled during a call")
+
+    results = []
+    plan_words = words_parse('writeln add 3 4 writeln greet "World"')
+    try:
+        plan_words_evaluation.compile = fail_compile
+        plan_words_evaluation.print = lambda value, end="\n": results.append(value)
+        evaluate_plan(plan_words)
+    finally:
+        del plan_words_evaluation.compile
+        del plan_words_evaluation.print
+    assert results == [7, "Hello, World"], results
+
+    # Bodies that are not expressions fall back to their text
+    evaluate_plan(words_parse('def shout#1 say arg 1 loudly'))
+    assert function_registry['shout']['code'] is None
+    
+    # Bodies see no Python builtins, so calling one falls back to the text
+    results = []
+    try:
+        plan_words_evaluation.print = lambda value, end="\n": results.append(value)
+        evaluate_plan(words_parse('def magnitude#1 abs ( arg 1 ) writeln magnitude -3'))
+    finally:
+        del plan_words_evaluation.print
+    assert results == ["abs ( -3 )"], results
+    function_registry.clear()
+    print("✅ compiled function bodies")
+
+
+def test_word_kinds():
+    """Literals are classified once by the parser"""
+    plan_words = words_parse('writeln 42 writeln -1.5 writeln "hi" writeln x')
+    assert plan_words.word_kinds == [WORD_OTHER, WORD_NUMBER, WORD_OTHER, WORD_NUMBER,
+                                     WORD_OTHER, WORD_STRING, WORD_OTHER, WORD_OTHER]
+    assert plan_words.word_values[1] == 42
+    assert plan_words.word_values[3] == -1.5
+    assert plan_words.word_values[5] == "hi"
+    print("✅ word kinds")
+
+
+def test_keyword_handlers():
+    """New keywords are registered in the dispatch table"""
+    results = []
+    plan_words_evaluation.keyword_handlers['twice'] = (
+        lambda plan_words, current_i, next_i: (2 * plan_words.word_values[next_i], next_i + 1))
+    try:
+        plan_words_evaluation.print = lambda value, end="\n": results.append(value)
+        evaluate_plan(words_parse('writeln twice 21 writeln 7'))
+    finally:
+        del plan_words_evaluation.keyword_handlers['twice']
+        del plan_words_evaluation.print
+    assert results == [42, 7], results
+    print("✅ keyword handlers")
+
+
+def test_plan_budget():
+    """Plans are cut off at the limits of their budget"""
+    results = []
+    try:
+        plan_words_evaluation.print = lambda value, end="\n": results.append(value)
+        budget = ExecutionBudget(max_steps=5)
+        try:
+            evaluate_plan(words_parse('times 10 { writeln times_count }'), budget)
+        except BudgetExceeded as e:
+            assert e.limit == 'steps' and budget.steps == 6
+        else:
+            assert False, "plan ran past its step limit"
+        assert plan_words_evaluation.times_count == 0
+
+        # Without a budget the same plan runs to the end
+        evaluate_plan(words_parse('times 10 { writeln times_count }'))
+    finally:
+        del plan_words_evaluation.print
+    print("✅ plan budget")
+
+
+def main():
+    test_bracket_matches()
+    test_skip_block()
+    test_compiled_function_body()
+    test_word_kinds()
+    test_keyword_handlers()
+    test_plan_budget()
+
+
+if __name__ == "__main__":
+    main()
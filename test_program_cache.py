@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the parsed program cache
+"""
+
+import os
+import shutil
+import tempfile
+
+from program_cache import load_program, load_plan_words, cache_path
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer
+from pangea_vm import PangeaVM
+from plan_words_parsing import words_parse
+
+
+PROGRAM = '''
+def double#1
+( arg 1 ) * 2
+print double 21
+print "a b"
+3 times print times_count 1
+'''
+
+
+def run_ingested(interpreter_class, program):
+    interpreter = interpreter_class(output=OutputBuffer(capture=True))
+    result = interpreter.exec_ingested(program)
+    return result, interpreter.output.getvalue()
+
+
+def run_source(interpreter_class, code):
+    interpreter = interpreter_class(output=OutputBuffer(capture=True))
+    result = interpreter.exec(code)
+    return result, interpreter.output.getvalue()
+
+
+def test_program_cache():
+    """Cached programs run like their source and follow source edits"""
+    print("=== Testing Program Cache ===")
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'program.pangea')
+    try:
+        with open(path, 'w') as f:
+            f.write(PROGRAM)
+
+        first = load_program(path)
+        assert os.path.exists(cache_path(path, 'pangea'))
+        second = load_program(path)
+        assert second == first
+        for interpreter_class in (PangeaInterpreter, PangeaVM):
+            assert run_ingested(interpreter_class, second) == run_source(interpreter_class, PROGRAM)
+
+        # Editing the source invalidates the entry
+        with open(path, 'w') as f:
+            f.write('print "edited"')
+        assert run_ingested(PangeaInterpreter, load_program(path))[1] == "edited\n"
+
+        # A damaged entry is ignored and rewritten
+        with open(cache_path(path, 'pangea'), 'wb') as f:
+            f.write(b'\x00garbage')
+        assert run_ingested(PangeaInterpreter, load_program(path))[1] == "edited\n"
+        assert load_program(path) == PangeaInterpreter.ingest_program('print "edited"')
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_ingested_needs_fresh_interpreter():
+    """Ingested programs are measured against the built-ins alone"""
+    interpreter = PangeaInterpreter(output=OutputBuffer(capture=True))
+    interpreter.exec('def print#0 1')
+    try:
+        interpreter.exec_ingested(PangeaInterpreter.ingest_program('print 2'))
+    except ValueError:
+        pass
+    else:
+        assert False, "exec_ingested ran on a used interpreter"
+
+
+def test_plan_cache():
+    """Cached plans keep their jump table and classification"""
+    print("=== Testing Plan Cache ===")
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'program.plan')
+    plan = 'writeln "hello world"\ntimes 2 { writeln times_count 1.5 }\n'
+    try:
+        with open(path, 'w') as f:
+            f.write(plan)
+        expected = words_parse(plan)
+        for _ in range(2):
+            plan_words = load_plan_words(path)
+            assert plan_words == expected
+            assert plan_words.bracket_matches == expected.bracket_matches
+            assert plan_words.word_kinds == expected.word_kinds
+            assert plan_words.word_values == expected.word_values
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    test_program_cache()
+    test_ingested_needs_fresh_interpreter()
+    test_plan_cache()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for memory-mapped source loading
+"""
+
+import os
+import tempfile
+
+from source_loading import mapped_lines, peak_rss
+from pangea_python_interpreter import PangeaInterpreter, OutputBuffer, tokenize
+from plan_words_parsing import words_parse
+
+
+def write_temp(data):
+    handle, path = tempfile.mkstemp()
+    with os.fdopen(handle, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_mapped_lines():
+    """Lines read through the map match text mode reading"""
+    print("=== Testing Mapped Lines ===")
+    data = 'print "café"\r\nprint 1\rprint 2\n\n# comment\nprint 3'.encode('utf-8')
+    path = write_temp(data)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            expected = list(f)
+        assert list(mapped_lines(path)) == expected
+        
+        interpreter = PangeaInterpreter(output=OutputBuffer(capture=True))
+        assert interpreter.parse_code(mapped_lines(path)) == interpreter.parse_code(data.decode('utf-8'))
+    finally:
+        os.remove(path)
+    
+    # Empty files cannot be mapped but still load
+    path = write_temp(b'')
+    try:
+        assert list(mapped_lines(path)) == []
+    finally:
+        os.remove(path)
+
+
+def test_crlf_line_numbers():
+    """CRLF files give one line per physical line, as LF files do"""
+    print("=== Testing CRLF Line Numbers ===")
+    path = write_temp(b'print 1\r\nprint 2\r\nprint 3\r\n')
+    try:
+        assert list(mapped_lines(path)) == ['print 1\n', 'print 2\n', 'print 3\n']
+        assert [token.line for token in tokenize(mapped_lines(path))] == [1, 1, 2, 2, 3, 3]
+    finally:
+        os.remove(path)
+
+
+def test_mapped_plan():
+    """Plans parse the same from a map as from a string"""
+    print("=== Testing Mapped Plan ===")
+    plan = 'writeln "hello world"  # greeting\ntimes 2 { writeln times_count }\n'
+    path = write_temp(plan.encode('utf-8'))
+    try:
+        assert words_parse(mapped_lines(path)) == words_parse(plan)
+    finally:
+        os.remove(path)
+
+
+def test_peak_rss():
+    """Peak RSS is reported in bytes where the platform supports it"""
+    peak = peak_rss()
+    assert peak is None or peak > 1024 * 1024
+
+
+def main():
+    test_mapped_lines()
+    test_crlf_line_numbers()
+    test_mapped_plan()
+    test_peak_rss()
+
+
+if __name__ == "__main__":
+    main()